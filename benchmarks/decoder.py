@@ -0,0 +1,68 @@
+"""Compare the streaming status decoder against the xmltodict baseline.
+
+Run from the repository root with ``python -m benchmarks.decoder``.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import timeit
+from typing import Any
+
+import xmltodict
+
+from custom_components.ventilation_system.decoder import decode_status
+from custom_components.ventilation_system.sensor import SENSORS
+from custom_components.ventilation_system.status import VentilationStatus
+
+FIXTURE = Path("tests/fixtures/status.xml")
+ROUNDS = 2000
+
+
+def value_as_text(value: Any) -> str | None:
+    """Normalize a value from xmltodict to stripped text, as the baseline did."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        for item in value:
+            text = value_as_text(item)
+            if text:
+                return text
+        return None
+    if isinstance(value, dict):
+        text = value.get("#text") or value.get("text")
+        if text:
+            stripped = str(text).strip()
+            return stripped or None
+        for nested in value.values():
+            text = value_as_text(nested)
+            if text:
+                return text
+        return None
+    stripped = str(value).strip()
+    return stripped or None
+
+
+def baseline_path(payload: bytes) -> None:
+    """The parse the integration shipped with: xmltodict plus value_as_text."""
+    data = xmltodict.parse(payload)["response"]
+    for description in SENSORS:
+        value_as_text(data.get(description.key))
+
+
+def decoder_path(payload: bytes) -> None:
+    status = VentilationStatus(decode_status(payload))
+    for description in SENSORS:
+        description.value_from(status)
+
+
+def main() -> None:
+    payload = FIXTURE.read_bytes()
+    for name, func in (("baseline", baseline_path), ("decoder", decoder_path)):
+        seconds = min(timeit.repeat(lambda: func(payload), number=ROUNDS, repeat=5))
+        print(f"{name:10s} {seconds / ROUNDS * 1e6:8.1f} us/poll")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Time the rolling heat recovery metrics over a year of minute samples.
+
+Run from the repository root with ``python -m benchmarks.metrics``.
+"""
+from __future__ import annotations
+
+import math
+import random
+import timeit
+
+from custom_components.ventilation_system.metrics import (
+    MIN_TEMPERATURE_SPREAD,
+    rolling_metrics,
+)
+
+SAMPLES = 365 * 24 * 60
+ROUNDS = 3
+
+
+def synthetic_year(seed: int = 1) -> tuple[list[float], list[float], list[float]]:
+    rng = random.Random(seed)
+    aul: list[float] = []
+    zul: list[float] = []
+    abl: list[float] = []
+    for minute in range(SAMPLES):
+        season = -math.cos(2 * math.pi * minute / SAMPLES)
+        day = -math.cos(2 * math.pi * (minute % 1440) / 1440)
+        outdoor = 10 + 12 * season + 4 * day + rng.gauss(0, 0.5)
+        exhaust = 21 + rng.gauss(0, 0.3)
+        aul.append(outdoor)
+        abl.append(exhaust)
+        zul.append(outdoor + 0.85 * (exhaust - outdoor) + rng.gauss(0, 0.3))
+    return aul, zul, abl
+
+
+def per_sample_loop(
+    aul: list[float], zul: list[float], abl: list[float]
+) -> dict[str, float | None]:
+    covariance = variance = gain_total = 0.0
+    for outdoor, supply, exhaust in zip(aul, zul, abl):
+        gain = supply - outdoor
+        spread = exhaust - outdoor
+        gain_total += gain
+        covariance += gain * spread
+        variance += spread * spread
+    return {
+        "heat_recovery_efficiency_24h": (
+            round(covariance / variance * 100, 1)
+            if variance >= MIN_TEMPERATURE_SPREAD**2 * len(aul)
+            else None
+        ),
+        "heat_recovery_gain_24h": round(gain_total / len(aul), 1),
+    }
+
+
+def main() -> None:
+    columns = synthetic_year()
+    print(f"{SAMPLES} samples")
+    for name, func in (("loop", per_sample_loop), ("columnar", rolling_metrics)):
+        seconds = min(timeit.repeat(lambda: func(*columns), number=ROUNDS, repeat=3))
+        print(f"{name:10s} {seconds / ROUNDS * 1e3:8.1f} ms/year  {func(*columns)}")
+
+
+if __name__ == "__main__":
+    main()
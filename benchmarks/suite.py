@@ -0,0 +1,203 @@
+"""Benchmark the coordinator poll path against simulated controllers.
+
+Run from the repository root with ``python -m benchmarks.suite``; pass
+``--output results.json`` to keep the machine-readable results, e.g. to
+compare runs before and after a change.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import asdict
+from datetime import datetime, timezone
+import json
+from pathlib import Path
+import platform
+import statistics
+from tempfile import TemporaryDirectory
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.ventilation_system.binary_sensor import BINARY_SENSORS
+from custom_components.ventilation_system.coordinator import (
+    VentilationDataCoordinator,
+    VentilationFleet,
+)
+from custom_components.ventilation_system.decoder import decode_status
+from custom_components.ventilation_system.sensor import SENSORS
+from custom_components.ventilation_system.status import (
+    VentilationStatus,
+    required_tags,
+)
+from custom_components.ventilation_system.transport import VentilationTransport
+from tests.simulator import FIXTURE, Behavior, ControllerFarm
+
+# Listener contexts of the entities the platforms create.
+ENTITY_CONTEXTS = [
+    *(description.key for description in SENSORS),
+    *(description.status_attr or description.key for description in BINARY_SENSORS),
+    "aktuell0",
+]
+LAN = Behavior(latency=(0.005, 0.03), chunk_delay=0.002, drift=0.3)
+
+
+def bench_parse(
+    seconds: float = 2.0, tags: frozenset[str] | None = None
+) -> dict[str, Any]:
+    payload = FIXTURE.read_bytes()
+    count = 0
+    start = time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < seconds:
+        for _ in range(100):
+            VentilationStatus(decode_status(payload, tags=tags))
+        count += 100
+    return {
+        "payload_bytes": len(payload),
+        "polls_per_second": round(count / elapsed),
+        "us_per_poll": round(elapsed / count * 1e6, 2),
+    }
+
+
+class EntityListeners:
+    """One listener per entity context, counting the callbacks it receives."""
+
+    def __init__(self, coordinator: VentilationDataCoordinator) -> None:
+        self.calls = 0
+        self._removers = [
+            coordinator.async_add_listener(self._callback, context)
+            for context in ENTITY_CONTEXTS
+        ]
+
+    def _callback(self) -> None:
+        self.calls += 1
+
+    def remove(self) -> None:
+        for remove in self._removers:
+            remove()
+
+
+def _coordinator(
+    hass: HomeAssistant, fleet: VentilationFleet, host: str
+) -> VentilationDataCoordinator:
+    fleet.register(host)
+    return VentilationDataCoordinator(hass, VentilationTransport(host), fleet)
+
+
+async def bench_refresh(hass: HomeAssistant, polls: int) -> dict[str, Any]:
+    farm = ControllerFarm(1, LAN)
+    fleet = VentilationFleet()
+    latencies: list[float] = []
+    writes: list[int] = []
+    async with farm.serve() as server:
+        coordinator = _coordinator(hass, fleet, ControllerFarm.host(server, 0))
+        listeners = EntityListeners(coordinator)
+        await coordinator.async_refresh()
+        for _ in range(polls):
+            calls = listeners.calls
+            start = time.perf_counter()
+            await coordinator.async_refresh()
+            latencies.append(time.perf_counter() - start)
+            writes.append(listeners.calls - calls)
+        listeners.remove()
+        await coordinator.transport.async_close()
+    ordered = sorted(latencies)
+    return {
+        "polls": polls,
+        "latency_ms": {
+            "mean": round(statistics.fmean(ordered) * 1000, 2),
+            "p50": round(ordered[len(ordered) // 2] * 1000, 2),
+            "p95": round(ordered[int(len(ordered) * 0.95)] * 1000, 2),
+        },
+        "entities": len(ENTITY_CONTEXTS),
+        "state_writes_per_poll": round(statistics.fmean(writes), 2),
+        "dispatch": asdict(coordinator.dispatch_stats),
+        "payload_hit_ratio": coordinator.payload_stats.hit_ratio,
+    }
+
+
+async def bench_scaling(hass: HomeAssistant, count: int, rounds: int) -> dict[str, Any]:
+    farm = ControllerFarm(count, LAN)
+    fleet = VentilationFleet()
+    async with farm.serve() as server:
+        coordinators = [
+            _coordinator(hass, fleet, ControllerFarm.host(server, unit))
+            for unit in range(count)
+        ]
+        listeners = [EntityListeners(coordinator) for coordinator in coordinators]
+        await asyncio.gather(
+            *(coordinator.async_refresh() for coordinator in coordinators)
+        )
+        durations = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            await asyncio.gather(
+                *(coordinator.async_refresh() for coordinator in coordinators)
+            )
+            durations.append(time.perf_counter() - start)
+        p95 = sorted(
+            fleet.latency_percentiles(coordinator.transport.host)["p95"] or 0.0
+            for coordinator in coordinators
+        )
+        for entity_listeners in listeners:
+            entity_listeners.remove()
+        await asyncio.gather(
+            *(coordinator.transport.async_close() for coordinator in coordinators)
+        )
+    round_seconds = statistics.fmean(durations)
+    return {
+        "controllers": count,
+        "round_ms": round(round_seconds * 1000, 2),
+        "polls_per_second": round(count / round_seconds, 1),
+        "worst_p95_ms": round(p95[-1] * 1000, 2),
+        "max_in_flight": farm.max_in_flight,
+        "state_writes": sum(entity_listeners.calls for entity_listeners in listeners),
+    }
+
+
+async def run(controllers: list[int], polls: int, rounds: int) -> dict[str, Any]:
+    with TemporaryDirectory() as config_dir:
+        # Coordinators only need the event loop side of Home Assistant.
+        hass = HomeAssistant(config_dir)
+        return {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "parse": bench_parse(),
+            # Only the tags read by the entities of the platforms.
+            "parse_projected": bench_parse(tags=required_tags(ENTITY_CONTEXTS)),
+            "refresh": await bench_refresh(hass, polls),
+            "scaling": [
+                await bench_scaling(hass, count, rounds) for count in controllers
+            ],
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--output", type=Path, help="write the JSON results here")
+    parser.add_argument(
+        "--controllers",
+        default="1,10,50,100,200",
+        help="comma separated fleet sizes (default: %(default)s)",
+    )
+    parser.add_argument("--polls", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    results = asyncio.run(
+        run(
+            [int(count) for count in args.controllers.split(",")],
+            args.polls,
+            args.rounds,
+        )
+    )
+    text = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
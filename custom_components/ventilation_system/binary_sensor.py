@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Callable
 
 from homeassistant.components.binary_sensor import (
     BinarySensorDeviceClass,
@@ -9,29 +8,25 @@ from homeassistant.components.binary_sensor import (
     BinarySensorEntityDescription,
 )
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import CONF_IP_ADDRESS, DATA_COORDINATOR, DOMAIN
-from .coordinator import VentilationDataCoordinator
+from .const import DATA_DEVICE, DOMAIN
+from .entity import (
+    VentilationDeviceContext,
+    VentilationEntity,
+    async_enabled_descriptions,
+)
+from .status import VentilationStatus
 
 
 @dataclass
 class VentilationBinarySensorDescription(BinarySensorEntityDescription):
-    is_on_fn: Callable[[dict[str, str]], bool] | None = None
-
-    def is_on(self, data: dict[str, str]) -> bool | None:
-        if not self.is_on_fn:
-            return None
-        return self.is_on_fn(data)
-
+    status_attr: str | None = None
 
-def _bool_from_text(value: str | None) -> bool | None:
-    if value is None:
-        return None
-    return value.strip().lower() == "ein"
+    def is_on(self, status: VentilationStatus) -> bool | None:
+        return status.get(self.status_attr or self.key)
 
 
 BINARY_SENSORS: tuple[VentilationBinarySensorDescription, ...] = (
@@ -39,22 +34,19 @@ BINARY_SENSORS: tuple[VentilationBinarySensorDescription, ...] = (
         key="filter0",
         name="Filter Replacement Needed",
         device_class=BinarySensorDeviceClass.PROBLEM,
-        is_on_fn=lambda data: "filterwechsel" in (data.get("filter0") or "").lower(),
+        status_attr="filter_replacement_needed",
     ),
     VentilationBinarySensorDescription(
         key="DiIn1",
         name="Digital Input 1",
-        is_on_fn=lambda data: _bool_from_text(data.get("DiIn1")),
     ),
     VentilationBinarySensorDescription(
         key="DiIn2",
         name="Digital Input 2",
-        is_on_fn=lambda data: _bool_from_text(data.get("DiIn2")),
     ),
     VentilationBinarySensorDescription(
         key="DiIn3",
         name="Digital Input 3",
-        is_on_fn=lambda data: _bool_from_text(data.get("DiIn3")),
     ),
 )
 
@@ -62,40 +54,29 @@ BINARY_SENSORS: tuple[VentilationBinarySensorDescription, ...] = (
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
-    entry_data = hass.data[DOMAIN][entry.entry_id]
-    coordinator: VentilationDataCoordinator = entry_data[DATA_COORDINATOR]
-
+    device: VentilationDeviceContext = hass.data[DOMAIN][entry.entry_id][DATA_DEVICE]
     async_add_entities(
-        VentilationBinarySensor(
-            coordinator, entry.entry_id, entry.data[CONF_IP_ADDRESS], description
+        VentilationBinarySensor(device, description)
+        for description in async_enabled_descriptions(
+            hass, Platform.BINARY_SENSOR, device, BINARY_SENSORS, "_binary"
         )
-        for description in BINARY_SENSORS
     )
 
 
-class VentilationBinarySensor(
-    CoordinatorEntity[VentilationDataCoordinator], BinarySensorEntity
-):
-    _attr_has_entity_name = True
+class VentilationBinarySensor(VentilationEntity, BinarySensorEntity):
+    entity_description: VentilationBinarySensorDescription
 
     def __init__(
         self,
-        coordinator: VentilationDataCoordinator,
-        entry_id: str,
-        ip_address: str,
+        device: VentilationDeviceContext,
         description: VentilationBinarySensorDescription,
     ) -> None:
-        super().__init__(coordinator)
-        self.entity_description = description
-        self._entry_id = entry_id
-        self._attr_unique_id = f"{entry_id}_{description.key}_binary"
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, entry_id)},
-            name="Fraenkische Ventilation",
-            manufacturer="Fraenkische Rohrwerke",
-            model="profi-air",
-            configuration_url=f"http://{ip_address}/",
+        super().__init__(
+            device,
+            f"{description.key}_binary",
+            description.status_attr or description.key,
         )
+        self.entity_description = description
 
     @property
     def is_on(self) -> bool | None:
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from enum import StrEnum
+import time
+from typing import Any
+
+# Consecutive timeouts or connection errors that open the breaker.
+FAILURE_THRESHOLD = 3
+# Seconds the breaker stays open before a probe; doubled after a failed probe.
+RESET_TIMEOUT = 30.0
+MAX_RESET_TIMEOUT = 600.0
+# A probe only gets this long, so a dead controller fails fast.
+PROBE_TIMEOUT = 3.0
+
+
+class CircuitState(StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of contacting a controller that is known to be down."""
+
+    def __init__(self, host: str, retry_in: float) -> None:
+        super().__init__(f"{host} is unreachable, next attempt in {retry_in:.0f} s")
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Track whether a controller answers and stop calling it while it does not.
+
+    After ``FAILURE_THRESHOLD`` consecutive failures the breaker opens and
+    requests fail immediately. Once the reset timeout passed, a single probe
+    with a short timeout is let through: success closes the breaker, failure
+    opens it again for twice as long.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        threshold: int = FAILURE_THRESHOLD,
+        reset_timeout: float = RESET_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.host = host
+        self._threshold = threshold
+        self._base_reset_timeout = reset_timeout
+        self._reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+        self.trips = 0
+
+    @property
+    def state(self) -> CircuitState:
+        if self._opened_at is None:
+            return CircuitState.CLOSED
+        if self._probing or self._clock() >= self._opened_at + self._reset_timeout:
+            return CircuitState.HALF_OPEN
+        return CircuitState.OPEN
+
+    def before_request(self, timeout: float) -> float:
+        """Return the timeout to use, or raise while the breaker is open."""
+        state = self.state
+        if state is CircuitState.CLOSED:
+            return timeout
+        if state is CircuitState.OPEN or self._probing:
+            assert self._opened_at is not None
+            raise CircuitOpenError(
+                self.host,
+                max(self._opened_at + self._reset_timeout - self._clock(), 0.0),
+            )
+        self._probing = True
+        return min(timeout, PROBE_TIMEOUT)
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._reset_timeout = self._base_reset_timeout
+
+    def record_failure(self) -> None:
+        if self._probing:
+            self._probing = False
+            self._reset_timeout = min(self._reset_timeout * 2, MAX_RESET_TIMEOUT)
+            self._opened_at = self._clock()
+            return
+        self._failures += 1
+        if self._opened_at is None and self._failures >= self._threshold:
+            self._opened_at = self._clock()
+            self.trips += 1
+
+    def release(self) -> None:
+        """Give up a probe that ended without an answer either way."""
+        self._probing = False
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "reset_timeout": self._reset_timeout,
+            "trips": self.trips,
+        }
@@ -0,0 +1,128 @@
+"""Track the controller clock stamped on every status.xml.
+
+The controller writes its local time and date into ``<time>`` and
+``<date>`` (``13:13:41``, ``Mi, 26.11.2025``) whenever it refreshes the
+document. A stamp that did not advance since the previous poll means the
+response is a repeat; comparing stamps with the time responses arrive gives
+the clock drift and how often the controller refreshes.
+"""
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime, tzinfo
+import re
+from typing import Any
+
+TIME_RE = re.compile(rb"<time>\s*(\d{1,2}):(\d{2}):(\d{2})\s*</time>")
+DATE_RE = re.compile(rb"<date>[^<]*?(\d{1,2})\.(\d{1,2})\.(\d{4})\s*</date>")
+
+# Values the coordinator fills in from the clock.
+CLOCK_FIELDS = ("clock_drift",)
+
+OFFSET_SAMPLES = 30
+# Responses needed before the refresh interval is trusted.
+MIN_TICK_SAMPLES = 5
+# Shorter refresh intervals are within the jitter of a one second clock.
+MIN_TICK = 3.0
+# Seconds after a controller refresh at which aligned polls land.
+TICK_MARGIN = 0.5
+
+
+def device_timestamp(payload: bytes, tz: tzinfo) -> float | None:
+    """Return the controller clock of a payload as a POSIX timestamp."""
+    if (clock := TIME_RE.search(payload)) is None or (
+        date := DATE_RE.search(payload)
+    ) is None:
+        return None
+    day, month, year = map(int, date.groups())
+    hour, minute, second = map(int, clock.groups())
+    try:
+        return datetime(year, month, day, hour, minute, second, tzinfo=tz).timestamp()
+    except ValueError:
+        return None
+
+
+class DeviceClock:
+    """Follow the stamps of one controller.
+
+    The stamp is the controller time of its last refresh, so ``stamp -
+    received`` is the drift minus the age of the document. Its maximum over
+    recent polls estimates the drift, its spread how far apart refreshes
+    are.
+    """
+
+    def __init__(self, tz: tzinfo, samples: int = OFFSET_SAMPLES) -> None:
+        self._tz = tz
+        self._offsets: deque[float] = deque(maxlen=samples)
+        # Last controller stamp; only moves backwards when the clock is reset.
+        self.timestamp: float | None = None
+        self._received = 0.0
+        self._tick: float | None = None
+        self.repeats = 0
+        self._repeated_since: float | None = None
+
+    def observe(self, payload: bytes, received: float) -> bool:
+        """Record the stamp of a response; False if it repeats the previous one.
+
+        Within a second of the previous response an equal stamp is expected
+        and the response is neither a repeat nor a new sample.
+        """
+        if (stamp := device_timestamp(payload, self._tz)) is None:
+            return True
+        if stamp == self.timestamp:
+            if received - self._received < 1:
+                return True
+            self.repeats += 1
+            if self._repeated_since is None:
+                self._repeated_since = received
+            return False
+        if self.timestamp is not None and stamp < self.timestamp:
+            # The clock was set back; earlier offsets no longer apply.
+            self._offsets.clear()
+            self._tick = None
+        self.timestamp = stamp
+        self._received = received
+        self._repeated_since = None
+        self._offsets.append(stamp - received)
+        if len(self._offsets) >= MIN_TICK_SAMPLES:
+            # Stamps have a resolution of one second.
+            spread = max(self._offsets) - min(self._offsets) + 1
+            # Polls aligned to refreshes all see fresh documents, which
+            # narrows the spread; keep the interval learnt before that.
+            if spread >= MIN_TICK:
+                self._tick = spread
+        return True
+
+    @property
+    def drift(self) -> float | None:
+        """Seconds the controller clock is ahead of Home Assistant."""
+        return max(self._offsets) if self._offsets else None
+
+    @property
+    def tick(self) -> float | None:
+        """Seconds between controller refreshes, once known."""
+        return self._tick
+
+    def delay_to_tick(self, at: float) -> float:
+        """Return how much later than ``at`` a poll lands just after a refresh."""
+        tick = self.tick
+        drift = self.drift
+        if tick is None or drift is None or self.timestamp is None:
+            return 0.0
+        last_refresh = self.timestamp - drift
+        return (last_refresh - at) % tick + TICK_MARGIN
+
+    def stalled_for(self, now: float) -> float | None:
+        """Seconds the controller has been repeating the same stamp."""
+        if self._repeated_since is None:
+            return None
+        return now - self._repeated_since
+
+    def as_dict(self, now: float) -> dict[str, Any]:
+        return {
+            "timestamp": self.timestamp,
+            "drift": self.drift,
+            "tick": self.tick,
+            "repeats": self.repeats,
+            "stalled_for": self.stalled_for(now),
+        }
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from aiohttp import FormData
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+
+from .transport import VentilationTransport
+
+
+@dataclass
+class VentilationCommand:
+    """A write to the controller; commands sharing a key supersede each other."""
+
+    key: str
+    method: str
+    path: str
+    data: FormData | None = None
+
+
+class RefreshCoalescer:
+    """Merge refresh requests into one fetch.
+
+    Every request restarts the settle window. The refresh runs once the
+    window passed without further requests and ``busy`` reports no commands
+    in flight; while commands are queued, the queue requests again when it
+    drains.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        refresh: Callable[[], Awaitable[None]],
+        settle: float,
+        busy: Callable[[], bool],
+        name: str,
+    ) -> None:
+        self._hass = hass
+        self._refresh = refresh
+        self._settle = settle
+        self._busy = busy
+        self._name = name
+        self._deadline = 0.0
+        self._requested = False
+        self._task: asyncio.Task[None] | None = None
+        self.coalesced = 0
+        self.executed = 0
+
+    @callback
+    def async_schedule(self) -> None:
+        """Request a refresh without waiting for it."""
+        self._deadline = self._hass.loop.time() + self._settle
+        if self._requested:
+            self.coalesced += 1
+        self._requested = True
+        if self._task is None or self._task.done():
+            self._task = self._hass.async_create_background_task(
+                self._async_run(), self._name
+            )
+
+    async def _async_run(self) -> None:
+        while self._requested:
+            if (delay := self._deadline - self._hass.loop.time()) > 0:
+                await asyncio.sleep(delay)
+                continue
+            if self._busy():
+                return
+            self._requested = False
+            self.executed += 1
+            await self._refresh()
+
+    def cancel(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+
+class VentilationCommandQueue:
+    """Serialize writes to one controller.
+
+    A command that is still waiting to be sent is replaced when a newer
+    command with the same key arrives; callers of both are resolved once the
+    newer one was sent. After the queue drains, ``on_drained`` runs once the
+    settle window passed without further commands to refresh the controller
+    state.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        transport: VentilationTransport,
+        on_drained: Callable[[], Awaitable[None]],
+        settle: float = 0.0,
+    ) -> None:
+        self._hass = hass
+        self._transport = transport
+        self.refresher = RefreshCoalescer(
+            hass,
+            on_drained,
+            settle,
+            lambda: self.busy,
+            f"ventilation refresh {transport.host}",
+        )
+        self._pending: OrderedDict[
+            str, tuple[VentilationCommand, list[asyncio.Future[None]]]
+        ] = OrderedDict()
+        self._worker: asyncio.Task[None] | None = None
+        self.sent = 0
+        self.coalesced = 0
+
+    @property
+    def busy(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    async def async_submit(self, command: VentilationCommand) -> None:
+        """Queue a command and wait until it (or its replacement) was sent."""
+        future: asyncio.Future[None] = self._hass.loop.create_future()
+        waiters = [future]
+        if (superseded := self._pending.pop(command.key, None)) is not None:
+            waiters = [*superseded[1], future]
+            self.coalesced += 1
+        self._pending[command.key] = (command, waiters)
+        if not self.busy:
+            self._worker = self._hass.async_create_background_task(
+                self._async_drain(), f"ventilation commands {self._transport.host}"
+            )
+        await future
+
+    async def _async_drain(self) -> None:
+        while self._pending:
+            _, (command, waiters) = self._pending.popitem(last=False)
+            try:
+                with self._transport.timing.measure("command"):
+                    await self._transport.async_request(
+                        command.method, command.path, command.data
+                    )
+            except HomeAssistantError as err:
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_exception(err)
+                continue
+            self.sent += 1
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(None)
+        self.refresher.async_schedule()
+
+    async def async_shutdown(self) -> None:
+        """Cancel the worker and fail commands that were not sent."""
+        if self._worker is not None:
+            self._worker.cancel()
+        self.refresher.cancel()
+        for _, waiters in self._pending.values():
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(HomeAssistantError("Integration unloaded"))
+        self._pending.clear()
@@ -1,10 +1,32 @@
+import ipaddress
+
 import voluptuous as vol
 from homeassistant import config_entries
-from homeassistant.const import CONF_HOST
+from homeassistant.const import CONF_HOST, CONF_HOSTS
+from homeassistant.core import callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 import homeassistant.helpers.config_validation as cv
-from .const import DOMAIN, LOGGER, CONF_IP_ADDRESS
-import aiohttp
-import async_timeout
+from homeassistant.helpers import discovery_flow
+from homeassistant.helpers.device_registry import format_mac
+from .const import (
+    CONF_CONFIRM_TIMEOUT,
+    CONF_IP_ADDRESS,
+    CONF_MAC,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MIN_SCAN_INTERVAL,
+    CONF_REFRESH_SETTLE,
+    CONF_TIMING,
+    DEFAULT_CONFIRM_TIMEOUT,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DEFAULT_REFRESH_SETTLE,
+    DOMAIN,
+    LOGGER,
+)
+from .discovery import DiscoveredController, async_probe, async_scan
+
+# Set on discovery flows for controllers the user already picked after a scan.
+SCAN_SELECTED = "scan_selected"
 
 DATA_SCHEMA = vol.Schema(
     {
@@ -15,29 +37,35 @@ DATA_SCHEMA = vol.Schema(
 class VentilationSystemConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for ventilation system."""
 
+    def __init__(self):
+        self._discovered = {}
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        return VentilationSystemOptionsFlowHandler(config_entry)
+
     async def async_step_user(self, user_input=None):
-        """Handle the initial step."""
+        """Handle the initial step.
+
+        The host may also be a subnet such as ``192.168.1.0/24``, which is
+        scanned for controllers that are then added in one go.
+        """
         errors = {}
 
         if user_input is not None:
-            self._async_abort_entries_match({CONF_IP_ADDRESS: user_input[CONF_HOST]})
-
-            # Here you can add any connection validation if needed
-            try:
-                async with async_timeout.timeout(10):
-                    async with aiohttp.ClientSession() as session:
-                        async with session.get(f"http://{user_input[CONF_HOST]}/status.xml") as response:
-                            if response.status == 200:
-                                text = await response.text()
-                pass
-            except Exception as err:
+            host = user_input[CONF_HOST].strip()
+            if "/" in host:
+                return await self._async_scan(host, user_input)
+            self._async_abort_entries_match({CONF_IP_ADDRESS: host})
+
+            session = async_get_clientsession(self.hass)
+            controller = await async_probe(session, host, timeout=10)
+            if controller is None:
                 errors["base"] = "cannot_connect"
-                LOGGER.debug("Cannot connect: %s", err)
+                LOGGER.debug("Cannot connect to %s", host)
             else:
-                return self.async_create_entry(
-                    title=user_input[CONF_HOST],
-                    data={CONF_IP_ADDRESS: user_input[CONF_HOST]},
-                )
+                return await self._async_create_controller_entry(controller)
 
         data_schema = self.add_suggested_values_to_schema(DATA_SCHEMA, user_input)
         return self.async_show_form(
@@ -46,22 +74,173 @@ class VentilationSystemConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             errors=errors,
         )
 
+    async def _async_scan(self, subnet, user_input):
+        try:
+            network = ipaddress.ip_network(subnet, strict=False)
+            if network.version != 4:
+                raise ValueError(subnet)
+            found = await async_scan(async_get_clientsession(self.hass), network)
+        except ValueError as err:
+            LOGGER.debug("Cannot scan %s: %s", subnet, err)
+            return self.async_show_form(
+                step_id="user",
+                data_schema=self.add_suggested_values_to_schema(DATA_SCHEMA, user_input),
+                errors={"base": "invalid_subnet"},
+            )
+
+        current = self._async_current_entries(include_ignore=False)
+        entries = {entry.unique_id: entry for entry in current if entry.unique_id}
+        configured_hosts = {entry.data.get(CONF_IP_ADDRESS) for entry in current}
+        self._discovered = {}
+        for controller in found:
+            entry = entries.get(format_mac(controller.mac)) if controller.mac else None
+            if entry is None:
+                if controller.host not in configured_hosts:
+                    self._discovered[controller.host] = controller
+            elif entry.data.get(CONF_IP_ADDRESS) != controller.host:
+                # DHCP moved a configured controller; follow it.
+                self.hass.config_entries.async_update_entry(
+                    entry, data={**entry.data, CONF_IP_ADDRESS: controller.host}
+                )
+        if not self._discovered:
+            return self.async_abort(reason="no_devices_found")
+        return await self.async_step_scan_confirm()
+
+    async def async_step_scan_confirm(self, user_input=None):
+        """Pick which of the controllers found by a scan to add."""
+        if user_input is not None:
+            selected = [
+                self._discovered[host]
+                for host in user_input[CONF_HOSTS]
+                if host in self._discovered
+            ]
+            if not selected:
+                return self.async_abort(reason="no_devices_found")
+            # This flow adds the first controller. The rest go through
+            # discovery flows, which add them without asking again since
+            # they were confirmed here.
+            for controller in selected[1:]:
+                discovery_flow.async_create_flow(
+                    self.hass,
+                    DOMAIN,
+                    context={"source": config_entries.SOURCE_INTEGRATION_DISCOVERY},
+                    data={
+                        CONF_IP_ADDRESS: controller.host,
+                        CONF_MAC: controller.mac,
+                        SCAN_SELECTED: True,
+                    },
+                )
+            return await self._async_create_controller_entry(selected[0])
+
+        hosts = {
+            host: f"{host} ({controller.mac})" if controller.mac else host
+            for host, controller in self._discovered.items()
+        }
+        return self.async_show_form(
+            step_id="scan_confirm",
+            data_schema=vol.Schema(
+                {vol.Required(CONF_HOSTS, default=list(hosts)): cv.multi_select(hosts)}
+            ),
+            description_placeholders={"count": str(len(hosts))},
+        )
+
+    async def async_step_integration_discovery(self, discovery_info):
+        """Handle a controller found by a subnet scan.
+
+        Controllers picked in the scan confirm step are added right away;
+        any other discovery is confirmed first.
+        """
+        controller = DiscoveredController(
+            discovery_info[CONF_IP_ADDRESS], discovery_info.get(CONF_MAC)
+        )
+        await self._async_set_controller_unique_id(controller)
+        self._async_abort_entries_match({CONF_IP_ADDRESS: controller.host})
+        if discovery_info.get(SCAN_SELECTED):
+            return await self._async_create_controller_entry(controller)
+        self._discovered = {controller.host: controller}
+        self.context["title_placeholders"] = {"name": controller.host}
+        return await self.async_step_discovery_confirm()
+
+    async def async_step_discovery_confirm(self, user_input=None):
+        """Confirm adding a controller found by a subnet scan."""
+        controller = next(iter(self._discovered.values()))
+        if user_input is not None:
+            return await self._async_create_controller_entry(controller)
+        self._set_confirm_only()
+        return self.async_show_form(
+            step_id="discovery_confirm",
+            description_placeholders={"host": controller.host},
+        )
+
+    async def _async_set_controller_unique_id(self, controller):
+        if controller.mac is not None:
+            # The MAC survives DHCP handing out a new address; follow the
+            # controller to it instead of adding it again.
+            await self.async_set_unique_id(format_mac(controller.mac))
+            self._abort_if_unique_id_configured(
+                updates={CONF_IP_ADDRESS: controller.host}
+            )
+
+    async def _async_create_controller_entry(self, controller):
+        await self._async_set_controller_unique_id(controller)
+        self._async_abort_entries_match({CONF_IP_ADDRESS: controller.host})
+        return self.async_create_entry(
+            title=controller.host,
+            data={CONF_IP_ADDRESS: controller.host, CONF_MAC: controller.mac},
+        )
+
 class VentilationSystemOptionsFlowHandler(config_entries.OptionsFlow):
     def __init__(self, config_entry):
         self.config_entry = config_entry
 
     async def async_step_init(self, user_input=None):
+        errors = {}
         if user_input is not None:
-            return self.async_create_entry(title="", data=user_input)
+            if user_input[CONF_MIN_SCAN_INTERVAL] > user_input[CONF_MAX_SCAN_INTERVAL]:
+                errors[CONF_MAX_SCAN_INTERVAL] = "max_below_min"
+            else:
+                options = dict(user_input)
+                host = options.pop(CONF_HOST)
+                # One update for host and options, so the entry reloads once;
+                # finishing the flow with the same options changes nothing.
+                self.hass.config_entries.async_update_entry(
+                    self.config_entry,
+                    data={**self.config_entry.data, CONF_IP_ADDRESS: host},
+                    options=options,
+                )
+                return self.async_create_entry(title="", data=options)
 
         default_host = (
             self.config_entry.data.get(CONF_HOST)
             or self.config_entry.data.get(CONF_IP_ADDRESS)
         )
 
+        options = {**self.config_entry.options, **(user_input or {})}
         return self.async_show_form(
             step_id="init",
             data_schema=vol.Schema({
-                vol.Required(CONF_HOST, default=default_host, description={}): str
-            })
+                vol.Required(
+                    CONF_HOST, default=options.get(CONF_HOST, default_host), description={}
+                ): str,
+                vol.Required(
+                    CONF_MIN_SCAN_INTERVAL,
+                    default=options.get(CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=3600)),
+                vol.Required(
+                    CONF_MAX_SCAN_INTERVAL,
+                    default=options.get(CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=3600)),
+                vol.Required(
+                    CONF_CONFIRM_TIMEOUT,
+                    default=options.get(CONF_CONFIRM_TIMEOUT, DEFAULT_CONFIRM_TIMEOUT),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=3600)),
+                vol.Required(
+                    CONF_REFRESH_SETTLE,
+                    default=options.get(CONF_REFRESH_SETTLE, DEFAULT_REFRESH_SETTLE),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=60)),
+                vol.Required(
+                    CONF_TIMING, default=options.get(CONF_TIMING, False)
+                ): bool,
+            }),
+            errors=errors,
         )
@@ -8,10 +8,42 @@ LOGGER = getLogger(__package__)
 
 DOMAIN = "ventilation_system"
 CONF_IP_ADDRESS = "ip_address"
+CONF_MAC = "mac"
+CONF_MIN_SCAN_INTERVAL = "min_scan_interval"
+CONF_MAX_SCAN_INTERVAL = "max_scan_interval"
+CONF_CONFIRM_TIMEOUT = "confirm_timeout"
+CONF_TIMING = "timing"
+CONF_REFRESH_SETTLE = "refresh_settle"
+DATA_COMMANDS = "commands"
 DATA_COORDINATOR = "coordinator"
+DATA_DEVICE = "device"
+DATA_ENTITY_INDEX = "entity_index"
+DATA_FLEET = "fleet"
+DATA_TRANSPORT = "transport"
+
+DEFAULT_SCAN_INTERVAL = 30
+DEFAULT_MIN_SCAN_INTERVAL = 5
+DEFAULT_MAX_SCAN_INTERVAL = 120
+# Seconds an optimistic value is shown before an unconfirmed command is reverted.
+DEFAULT_CONFIRM_TIMEOUT = 60
+# Seconds without new commands before the state is refreshed after commands.
+DEFAULT_REFRESH_SETTLE = 1.0
+# Status requests allowed in flight across all controllers at once.
+MAX_CONCURRENT_POLLS = 8
+# Polls at the minimum interval after a command before backing off again.
+FAST_POLLS_AFTER_COMMAND = 3
+
+STORAGE_VERSION = 1
+# Seconds to batch snapshot writes to storage.
+STORAGE_SAVE_DELAY = 60
 
 PLATFORMS: list[Platform] = [Platform.SENSOR, Platform.NUMBER, Platform.BINARY_SENSOR]
 
 SERVICE_SET_STAGE = "set_stage"
 SERVICE_SET_WEEK_PROGRAM = "set_week_program"
+SERVICE_SET_WEEK_PROGRAMS = "set_week_programs"
 SERVICE_SET_BYPASS_MODE = "set_bypass_mode"
+SERVICE_GET_HISTORY = "get_history"
+SERVICE_GET_FAN_TELEMETRY = "get_fan_telemetry"
+SERVICE_GET_WEEK_SCHEDULE = "get_week_schedule"
+SERVICE_SYNC_WEEK_SCHEDULE = "sync_week_schedule"
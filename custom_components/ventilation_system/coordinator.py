@@ -1,47 +1,528 @@
 from __future__ import annotations
 
 import asyncio
-from datetime import timedelta
+from collections import deque
+from collections.abc import AsyncIterator, Iterable, Mapping
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import hashlib
+import math
+import re
+import time
+from typing import Any
 
 import aiohttp
-import async_timeout
-import xmltodict
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from aiohttp import hdrs
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.device_registry import format_mac
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
-from .const import LOGGER
+from .breaker import CircuitOpenError
+from .clock import DeviceClock
+from .const import (
+    DEFAULT_CONFIRM_TIMEOUT,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DEFAULT_SCAN_INTERVAL,
+    FAST_POLLS_AFTER_COMMAND,
+    LOGGER,
+    MAX_CONCURRENT_POLLS,
+    STORAGE_SAVE_DELAY,
+)
+from .decoder import decode_status
+from .discovery import MAC_TAG
+from .history import HISTORY_FIELDS, VentilationHistory
+from .metrics import rolling_metrics
+from .schedule import SCHEDULE_TAGS, WeekProgram, parse_week_schedule
+from .status import VentilationStatus, required_tags
+from .telemetry import TELEMETRY_FIELDS, FanTelemetry
+from .transport import VentilationTransport
 
+# The controller stamps every document with its clock, which would defeat
+# the payload hash; those tags are ignored when comparing payloads.
+CLOCK_TAGS_RE = re.compile(rb"<(time|date)>[^<]*</\1>")
 
-class VentilationDataCoordinator(DataUpdateCoordinator[dict[str, str]]):
+# History resolution the rolling heat recovery metrics are computed from.
+ROLLING_RESOLUTION = "15m"
+
+
+def payload_digest(payload: bytes) -> bytes:
+    """Hash a status.xml payload, ignoring the controller clock."""
+    return hashlib.blake2b(CLOCK_TAGS_RE.sub(b"", payload), digest_size=16).digest()
+
+
+@dataclass
+class DispatchStatistics:
+    """Counts of entity updates sent and suppressed by change detection."""
+
+    last_notified: int = 0
+    last_suppressed: int = 0
+    total_notified: int = 0
+    total_suppressed: int = 0
+
+    def record(self, notified: int, suppressed: int) -> None:
+        self.last_notified = notified
+        self.last_suppressed = suppressed
+        self.total_notified += notified
+        self.total_suppressed += suppressed
+
+
+@dataclass
+class PayloadCacheStatistics:
+    """Counts of polls answered with an unchanged payload."""
+
+    hits: int = 0
+    misses: int = 0
+    # Hits recognized by a controller clock that had not advanced.
+    repeats: int = 0
+
+    @property
+    def hit_ratio(self) -> float | None:
+        total = self.hits + self.misses
+        if not total:
+            return None
+        return self.hits / total
+
+
+class VentilationFleet:
+    """Schedule status polls of all configured controllers.
+
+    Each controller gets an evenly spaced phase within its poll interval so
+    that polls do not fire in bursts, and a shared semaphore caps the number
+    of requests in flight.
+    """
+
+    def __init__(
+        self, max_concurrent: int = MAX_CONCURRENT_POLLS, samples: int = 100
+    ) -> None:
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._samples = samples
+        self._hosts: list[str] = []
+        self._latencies: dict[str, deque[float]] = {}
+
+    def register(self, host: str) -> None:
+        if host not in self._hosts:
+            self._hosts.append(host)
+            self._latencies[host] = deque(maxlen=self._samples)
+
+    def unregister(self, host: str) -> None:
+        if host in self._hosts:
+            self._hosts.remove(host)
+            self._latencies.pop(host, None)
+
+    def phase(self, host: str) -> float:
+        """Return the fraction of the interval at which the host is polled."""
+        if host not in self._hosts:
+            return 0.0
+        return self._hosts.index(host) / len(self._hosts)
+
+    def aligned_interval(
+        self,
+        host: str,
+        seconds: float,
+        now: float,
+        lower: float = 0.0,
+        upper: float = math.inf,
+    ) -> float:
+        """Stretch or shorten an interval so the next poll lands on the host's slot.
+
+        The result stays within ``lower`` and ``upper``; when no slot lies
+        in between, the poll gives up its slot rather than the bounds.
+        """
+        offset = self.phase(host) * seconds
+        slot = math.ceil((now + seconds / 2 - offset) / seconds)
+        interval = slot * seconds + offset - now
+        if interval < lower:
+            interval += math.ceil((lower - interval) / seconds) * seconds
+        elif interval > upper:
+            interval -= math.ceil((interval - upper) / seconds) * seconds
+        return min(max(interval, lower), upper)
+
+    def slot_delay(self, seconds: float, delay: float) -> float:
+        """Return ``delay`` if a poll pushed back by it stays in its slot, else 0.
+
+        Slots are ``seconds`` divided by the number of hosts apart; a longer
+        delay would move the poll into the slot of the next host.
+        """
+        return delay if delay < seconds / max(len(self._hosts), 1) else 0.0
+
+    @asynccontextmanager
+    async def slot(self, host: str) -> AsyncIterator[None]:
+        """Hold one of the shared request slots and record its latency."""
+        async with self._semaphore:
+            start = time.monotonic()
+            try:
+                yield
+            finally:
+                if (latencies := self._latencies.get(host)) is not None:
+                    latencies.append(time.monotonic() - start)
+
+    def latency_percentiles(self, host: str) -> dict[str, float | None]:
+        """Return p50/p95 fetch latency in seconds for a host."""
+        ordered = sorted(self._latencies.get(host, ()))
+        if not ordered:
+            return {"p50": None, "p95": None}
+        last = len(ordered) - 1
+        return {
+            "p50": ordered[round(0.5 * last)],
+            "p95": ordered[round(0.95 * last)],
+        }
+
+
+class VentilationDataCoordinator(DataUpdateCoordinator[VentilationStatus]):
     """Fetch data from the ventilation controller."""
 
-    def __init__(self, hass: HomeAssistant, ip_address: str) -> None:
-        self._ip_address = ip_address
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        transport: VentilationTransport,
+        fleet: VentilationFleet,
+        min_interval: float = DEFAULT_MIN_SCAN_INTERVAL,
+        max_interval: float = DEFAULT_MAX_SCAN_INTERVAL,
+        confirm_timeout: float = DEFAULT_CONFIRM_TIMEOUT,
+        store: Store[dict[str, Any]] | None = None,
+    ) -> None:
+        self.transport = transport
+        self.fleet = fleet
+        self._store = store
+        # True while the data is a restored snapshot or the last one fetched
+        # before the controller stopped answering.
+        self.stale = False
+        self.last_good_update: datetime | None = None
+        self._min_interval = min_interval
+        self._max_interval = max(min_interval, max_interval)
+        self._base_interval = min(
+            max(DEFAULT_SCAN_INTERVAL, self._min_interval), self._max_interval
+        )
+        self._fast_polls = 0
+        # Fields changed by the last refresh; None notifies every listener.
+        self._changed_fields: set[str] | None = None
+        # Listener callbacks with the field each one shows.
+        self._contexts: dict[CALLBACK_TYPE, tuple[CALLBACK_TYPE, Any]] = {}
+        self.dispatch_stats = DispatchStatistics()
+        self.payload_stats = PayloadCacheStatistics()
+        self._payload_digest: bytes | None = None
+        # Last snapshot reported by the controller, without optimistic values.
+        self._device_status: VentilationStatus | None = None
+        self._optimistic: dict[str, tuple[Any, float]] = {}
+        self._confirm_timeout = confirm_timeout
+        self._etag: str | None = None
+        self._last_modified: str | None = None
+        # Tags decoded from status.xml; recomputed when listeners change.
+        self._projection: frozenset[str] | None = None
+        self._decoded_tags: frozenset[str] | None = None
+        self.history = VentilationHistory()
+        self.telemetry = FanTelemetry()
+        self.clock = DeviceClock(dt_util.get_default_time_zone())
+        # Raw values the week programs were parsed from, and the programs.
+        self._schedule: tuple[Mapping[str, str], dict[int, WeekProgram]] | None = None
         super().__init__(
             hass,
             LOGGER,
-            name=f"Ventilation system ({ip_address})",
-            update_interval=timedelta(seconds=30),
+            name=f"Ventilation system ({transport.host})",
+            update_interval=timedelta(seconds=self._base_interval),
+            # Every poll is dispatched; async_update_listeners filters by
+            # field, which also counts the polls that changed nothing.
+            always_update=True,
         )
 
-    async def _async_update_data(self) -> dict[str, str]:
-        session = async_get_clientsession(self.hass)
+    @callback
+    def async_update_listeners(self) -> None:
+        """Only notify entities whose fields changed since the last refresh."""
+        changed = self._changed_fields
+        notified = suppressed = 0
+        with self.transport.timing.measure("dispatch"):
+            for update_callback, context in list(self._contexts.values()):
+                if (
+                    changed is not None
+                    and context is not None
+                    and context not in changed
+                ):
+                    suppressed += 1
+                    continue
+                notified += 1
+                update_callback()
+        self.dispatch_stats.record(notified, suppressed)
+
+    @callback
+    def async_add_listener(
+        self, update_callback: CALLBACK_TYPE, context: Any = None
+    ) -> CALLBACK_TYPE:
+        """Listen for updates and decode the field of the listener from now on."""
+        remove_listener = super().async_add_listener(update_callback, context)
+        self._contexts[remove_listener] = (update_callback, context)
+        self._projection = None
+
+        @callback
+        def remove_projected_listener() -> None:
+            remove_listener()
+            self._contexts.pop(remove_listener, None)
+            self._projection = None
+
+        return remove_projected_listener
+
+    @callback
+    def _async_projection(self) -> frozenset[str] | None:
+        """Return the status.xml tags to decode, or None for all of them.
+
+        Every entity listens with the field it shows as context. Disabling an
+        entity in the registry removes its listener and enabling one reloads
+        the entry, so the contexts always match the enabled entities. Until
+        the platforms are set up there are no listeners and all tags are
+        decoded.
+        """
+        if not self._contexts:
+            return None
+        if self._projection is None:
+            self._projection = SCHEDULE_TAGS | {MAC_TAG} | required_tags(
+                (
+                    *HISTORY_FIELDS,
+                    *TELEMETRY_FIELDS,
+                    *(
+                        context
+                        for _, context in self._contexts.values()
+                        if isinstance(context, str)
+                    ),
+                )
+            )
+        if self._optimistic:
+            return self._projection | required_tags(self._optimistic)
+        return self._projection
+
+    async def async_restore_snapshot(self) -> bool:
+        """Seed the data with the snapshot stored by a previous run."""
+        if self._store is None or not (stored := await self._store.async_load()):
+            return False
+        self._device_status = VentilationStatus(stored["raw"])
+        self.data = self._device_status
+        self.stale = True
+        return True
+
+    @callback
+    def _async_save_snapshot(self) -> None:
+        if self._store is not None:
+            self._store.async_delay_save(self._snapshot_to_store, STORAGE_SAVE_DELAY)
+
+    @callback
+    def _snapshot_to_store(self) -> dict[str, Any]:
+        return {"raw": dict(self._device_status.raw) if self._device_status else {}}
+
+    @property
+    def mac(self) -> str | None:
+        """MAC address the controller reports, in device registry form."""
+        raw = self._device_status.raw.get(MAC_TAG) if self._device_status else None
+        return format_mac(raw.strip()) if raw and raw.strip() else None
+
+    @property
+    def week_schedule(self) -> dict[int, WeekProgram]:
+        """Week programs last reported by the controller, parsed once per payload."""
+        raw = self._device_status.raw if self._device_status else {}
+        if self._schedule is None or self._schedule[0] is not raw:
+            self._schedule = (raw, parse_week_schedule(raw))
+        return self._schedule[1]
+
+    @callback
+    def async_note_week_programs(self, programs: Iterable[WeekProgram]) -> None:
+        """Record written programs until the next payload reports them."""
+        schedule = self.week_schedule
+        for program in programs:
+            schedule[program.program] = program
+
+    @callback
+    def async_note_command(self) -> None:
+        """Poll at the minimum interval for a while after a command."""
+        self._fast_polls = FAST_POLLS_AFTER_COMMAND
+        self.update_interval = timedelta(seconds=self._min_interval)
+
+    async def async_refresh_after_commands(self) -> None:
+        """Refresh once all queued commands were sent.
+
+        The command queue already merges these requests, so the refresh
+        bypasses the debouncer of ``async_request_refresh``.
+        """
+        self.async_note_command()
+        await self.async_refresh()
+
+    @callback
+    def _async_adapt_interval(self, changed: bool | None) -> None:
+        """Pick the next poll interval; ``changed`` is None after a failure."""
+        current = self.update_interval.total_seconds()
+        if changed is None:
+            self._fast_polls = 0
+            seconds = current * 2
+        elif self._fast_polls:
+            self._fast_polls -= 1
+            self.update_interval = timedelta(seconds=self._min_interval)
+            return
+        elif changed:
+            seconds = self._base_interval
+        else:
+            seconds = current * 2
+        seconds = min(max(seconds, self._min_interval), self._max_interval)
+        seconds = self.fleet.aligned_interval(
+            self.transport.host,
+            seconds,
+            self.hass.loop.time(),
+            self._min_interval,
+            self._max_interval,
+        )
+        # Land just after the controller refreshed its status document,
+        # unless waiting for the refresh would leave the fleet slot or
+        # exceed the longest interval.
+        delay = self.fleet.slot_delay(
+            seconds, self.clock.delay_to_tick(time.time() + seconds)
+        )
+        if seconds + delay <= self._max_interval:
+            seconds += delay
+        self.update_interval = timedelta(seconds=seconds)
+
+    async def _async_update_data(self) -> VentilationStatus:
         try:
-            async with async_timeout.timeout(15):
-                response = await session.get(
-                    f"http://{self._ip_address}/status.xml"
+            status = await self._async_fetch_status()
+        except UpdateFailed:
+            self._async_adapt_interval(None)
+            # Entities keep showing the last good snapshot, marked stale.
+            self.stale = self.data is not None
+            raise
+        self.last_good_update = dt_util.utcnow()
+        self._async_adapt_interval(self._changed_fields != set())
+        if self.stale:
+            # Every entity drops its stale marker, not only the changed ones;
+            # the refresh dispatches even when the status equals the snapshot.
+            self.stale = False
+            self._changed_fields = None
+        return status
+
+    async def _async_fetch_status(self) -> VentilationStatus:
+        previous = self.data if self.last_update_success else None
+        self._changed_fields = None
+        self._device_status = await self._async_fetch_device_status(
+            self._device_status if previous is not None else None
+        )
+        now = time.time()
+        self.history.add(now, self._device_status)
+        self.telemetry.add(now, self._device_status)
+        self._device_status = self._async_apply_rolling_metrics(self._device_status)
+        if self._device_status.clock_drift != (drift := self._clock_drift()):
+            self._device_status = self._device_status.replace(clock_drift=drift)
+        status = self._async_apply_optimistic(self._device_status)
+        if previous is not None:
+            self._changed_fields = (
+                set() if status is previous else status.changed_fields(previous)
+            )
+        return status
+
+    async def _async_fetch_device_status(
+        self, last: VentilationStatus | None
+    ) -> VentilationStatus:
+        """Fetch the controller state, reusing ``last`` for an unchanged payload."""
+        tags = self._async_projection()
+        if tags != self._decoded_tags:
+            # ``last`` lacks fields that are wanted now.
+            last = None
+        headers: dict[str, str] = {}
+        if last is not None:
+            if self._etag:
+                headers[hdrs.IF_NONE_MATCH] = self._etag
+            if self._last_modified:
+                headers[hdrs.IF_MODIFIED_SINCE] = self._last_modified
+        try:
+            async with self.fleet.slot(self.transport.host):
+                response, payload = await self.transport.async_get(
+                    "/status.xml", headers
                 )
-                response.raise_for_status()
-                body = await response.text()
+        except CircuitOpenError as err:
+            raise UpdateFailed(str(err)) from err
         except asyncio.TimeoutError as err:
             raise UpdateFailed("Timeout while requesting status.xml") from err
         except aiohttp.ClientError as err:
             raise UpdateFailed(f"Error requesting status.xml: {err}") from err
 
+        if response.status == 304 and last is not None:
+            self.payload_stats.hits += 1
+            return last
+        self._etag = response.headers.get(hdrs.ETAG)
+        self._last_modified = response.headers.get(hdrs.LAST_MODIFIED)
+        if not self.clock.observe(payload, time.time()) and last is not None:
+            LOGGER.debug("%s repeated its previous status", self.transport.host)
+            self.payload_stats.hits += 1
+            self.payload_stats.repeats += 1
+            return last
+        digest = payload_digest(payload)
+        if last is not None and digest == self._payload_digest:
+            self.payload_stats.hits += 1
+            return last
+
         try:
-            parsed: dict[str, str] = xmltodict.parse(body)["response"]
-        except (KeyError, ValueError) as err:
+            with self.transport.timing.measure("parse"):
+                status = VentilationStatus(
+                    decode_status(payload, response.charset, tags)
+                )
+        except ValueError as err:
             raise UpdateFailed("Invalid payload received from ventilation controller") from err
 
-        return parsed
+        self.payload_stats.misses += 1
+        self._payload_digest = digest
+        self._decoded_tags = tags
+        self._async_save_snapshot()
+        return status
+
+    def _clock_drift(self) -> int | None:
+        """Return the controller clock drift in whole seconds, its resolution."""
+        drift = self.clock.drift
+        return None if drift is None else round(drift)
+
+    @callback
+    def _async_apply_rolling_metrics(
+        self, status: VentilationStatus
+    ) -> VentilationStatus:
+        """Attach the 24 h heat recovery metrics computed from the history."""
+        metrics = rolling_metrics(
+            *self.history.columns(("aul0", "zul0", "abl0"), ROLLING_RESOLUTION)
+        )
+        if all(status.get(attr) == value for attr, value in metrics.items()):
+            return status
+        return status.replace(**metrics)
+
+    @callback
+    def async_set_optimistic(self, field: str, value: Any) -> None:
+        """Show a commanded value right away until a poll confirms it."""
+        if self.data is None:
+            return
+        self._optimistic[field] = (
+            value,
+            self.hass.loop.time() + self._confirm_timeout,
+        )
+        status = self.data.replace(**{field: value})
+        self._changed_fields = status.changed_fields(self.data)
+        self.data = status
+        self.async_update_listeners()
+
+    @callback
+    def _async_apply_optimistic(self, status: VentilationStatus) -> VentilationStatus:
+        """Overlay unconfirmed commanded values on a polled snapshot.
+
+        A value is dropped once the controller reports it, or reverted to the
+        reported value when it was not confirmed within the timeout.
+        """
+        if not self._optimistic:
+            return status
+        now = self.hass.loop.time()
+        overrides: dict[str, Any] = {}
+        for field, (value, deadline) in list(self._optimistic.items()):
+            if status.get(field) == value:
+                del self._optimistic[field]
+            elif now < deadline:
+                overrides[field] = value
+            else:
+                LOGGER.debug(
+                    "%s was not confirmed by %s, reverting to %s",
+                    field,
+                    self.transport.host,
+                    status.get(field),
+                )
+                del self._optimistic[field]
+        return status.replace(**overrides) if overrides else status
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from collections.abc import Collection
+from xml.parsers import expat
+
+
+class StatusDecoder:
+    """Incrementally decode status.xml into a flat tag to text mapping.
+
+    The controller answers with a single ``<response>`` element whose children
+    carry one value each, so the payload is decoded in one pass without
+    building an intermediate tree.
+
+    With ``tags`` only those values are collected. The text handler is only
+    installed inside a wanted element, so expat does not create strings for
+    the text of the others.
+    """
+
+    def __init__(
+        self, encoding: str | None = None, tags: Collection[str] | None = None
+    ) -> None:
+        self._parser = expat.ParserCreate(encoding)
+        self._parser.buffer_text = True
+        self._parser.StartElementHandler = self._start_element
+        self._parser.EndElementHandler = self._end_element
+        self._tags = tags
+        self._collecting = False
+        self._depth = 0
+        self._root: str | None = None
+        self._text: list[str] = []
+        self._values: dict[str, str] = {}
+
+    def feed(self, chunk: bytes) -> None:
+        """Feed the next chunk of the payload."""
+        try:
+            self._parser.Parse(chunk, False)
+        except expat.ExpatError as err:
+            raise ValueError(f"Malformed status payload: {err}") from err
+
+    def close(self) -> dict[str, str]:
+        """Finish decoding and return the collected values."""
+        try:
+            self._parser.Parse(b"", True)
+        except expat.ExpatError as err:
+            raise ValueError(f"Malformed status payload: {err}") from err
+        if self._root != "response":
+            raise ValueError(f"Unexpected root element: {self._root}")
+        return self._values
+
+    def _start_element(self, name: str, attrs: dict[str, str]) -> None:
+        self._depth += 1
+        if self._depth == 1:
+            self._root = name
+        elif self._depth == 2 and (self._tags is None or name in self._tags):
+            self._text.clear()
+            self._collecting = True
+            self._parser.CharacterDataHandler = self._character_data
+
+    def _end_element(self, name: str) -> None:
+        if self._depth == 2 and self._collecting:
+            self._values[name] = "".join(self._text).strip()
+            self._collecting = False
+            self._parser.CharacterDataHandler = None
+        self._depth -= 1
+
+    def _character_data(self, data: str) -> None:
+        if self._depth == 2:
+            self._text.append(data)
+
+
+def decode_status(
+    payload: bytes,
+    encoding: str | None = None,
+    tags: Collection[str] | None = None,
+) -> dict[str, str]:
+    """Decode a complete status.xml payload."""
+    decoder = StatusDecoder(encoding, tags)
+    decoder.feed(payload)
+    return decoder.close()
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from dataclasses import asdict
+import time
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .commands import VentilationCommandQueue
+from .const import CONF_IP_ADDRESS, CONF_MAC, DATA_COMMANDS, DATA_COORDINATOR, DOMAIN
+from .coordinator import VentilationDataCoordinator
+
+TO_REDACT = {CONF_IP_ADDRESS, CONF_MAC, "config_ip", "config_mac"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    coordinator: VentilationDataCoordinator = entry_data[DATA_COORDINATOR]
+    commands: VentilationCommandQueue = entry_data[DATA_COMMANDS]
+    data = coordinator.data
+    return {
+        "entry": async_redact_data(dict(entry.data), TO_REDACT),
+        "last_update_success": coordinator.last_update_success,
+        "stale": coordinator.stale,
+        "last_good_update": coordinator.last_good_update,
+        "circuit_breaker": coordinator.transport.breaker.as_dict(),
+        "dispatch": asdict(coordinator.dispatch_stats),
+        "commands": {
+            "sent": commands.sent,
+            "coalesced": commands.coalesced,
+            "refreshes_coalesced": commands.refresher.coalesced,
+            "refreshes_executed": commands.refresher.executed,
+        },
+        "payload_cache": {
+            **asdict(coordinator.payload_stats),
+            "hit_ratio": coordinator.payload_stats.hit_ratio,
+        },
+        "fetch_latency": coordinator.fleet.latency_percentiles(
+            entry.data[CONF_IP_ADDRESS]
+        ),
+        "timing": coordinator.transport.timing.as_dict(),
+        "history": coordinator.history.as_dict(),
+        "fan_telemetry": coordinator.telemetry.as_dict(),
+        "device_clock": coordinator.clock.as_dict(time.time()),
+        "status": async_redact_data(dict(data.raw), TO_REDACT) if data else None,
+    }
@@ -0,0 +1,80 @@
+"""Find controllers by probing status.xml on every address of a subnet."""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+import ipaddress
+import re
+
+import aiohttp
+import async_timeout
+
+# Tag carrying the controller's MAC address in status.xml.
+MAC_TAG = "config_mac"
+MAC_RE = re.compile(rb"<config_mac>\s*([0-9A-Fa-f]{2}(?:[:-][0-9A-Fa-f]{2}){5})\s*</config_mac>")
+
+# Probes in flight at once while scanning.
+SCAN_WORKERS = 64
+PROBE_TIMEOUT = 2.0
+# Largest subnet a scan accepts, a /22.
+MAX_SCAN_ADDRESSES = 1024
+
+
+@dataclass(frozen=True, slots=True)
+class DiscoveredController:
+    host: str
+    # Lower case and colon separated, the form of device registry connections.
+    mac: str | None
+
+
+def controller_mac(payload: bytes) -> str | None:
+    """Return the MAC address a controller reports in status.xml."""
+    if (match := MAC_RE.search(payload)) is None:
+        return None
+    return match.group(1).decode().replace("-", ":").lower()
+
+
+async def async_probe(
+    session: aiohttp.ClientSession, host: str, timeout: float = PROBE_TIMEOUT
+) -> DiscoveredController | None:
+    """Return the controller answering at ``host``, if any."""
+    try:
+        async with async_timeout.timeout(timeout):
+            async with session.get(f"http://{host}/status.xml") as response:
+                response.raise_for_status()
+                payload = await response.read()
+    except (asyncio.TimeoutError, aiohttp.ClientError):
+        return None
+    if b"<response>" not in payload:
+        return None
+    return DiscoveredController(host, controller_mac(payload))
+
+
+async def async_scan(
+    session: aiohttp.ClientSession,
+    network: ipaddress.IPv4Network,
+    port: int = 80,
+    workers: int = SCAN_WORKERS,
+    timeout: float = PROBE_TIMEOUT,
+) -> list[DiscoveredController]:
+    """Probe every host of a network and return the controllers found.
+
+    A fixed pool of workers pulls addresses from one shared iterator, so at
+    most ``workers`` probes are in flight however large the network is.
+    """
+    if network.num_addresses > MAX_SCAN_ADDRESSES:
+        raise ValueError(f"{network} has more than {MAX_SCAN_ADDRESSES} addresses")
+    addresses = iter(network.hosts())
+    suffix = "" if port == 80 else f":{port}"
+    found: list[DiscoveredController] = []
+
+    async def worker() -> None:
+        for address in addresses:
+            controller = await async_probe(session, f"{address}{suffix}", timeout)
+            if controller is not None:
+                found.append(controller)
+
+    await asyncio.gather(*(worker() for _ in range(min(workers, network.num_addresses))))
+    return sorted(
+        found, key=lambda controller: ipaddress.ip_address(controller.host.split(":")[0])
+    )
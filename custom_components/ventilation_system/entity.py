@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.device_registry import CONNECTION_NETWORK_MAC, DeviceInfo
+from homeassistant.helpers.entity import EntityDescription
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .commands import VentilationCommandQueue
+from .const import DOMAIN
+from .coordinator import VentilationDataCoordinator
+
+_DescriptionT = TypeVar("_DescriptionT", bound=EntityDescription)
+
+
+@dataclass(slots=True)
+class VentilationDeviceContext:
+    """Objects shared by every entity of one config entry."""
+
+    entry_id: str
+    coordinator: VentilationDataCoordinator
+    commands: VentilationCommandQueue
+    device_info: DeviceInfo
+
+    @classmethod
+    def create(
+        cls,
+        entry_id: str,
+        ip_address: str,
+        coordinator: VentilationDataCoordinator,
+        commands: VentilationCommandQueue,
+        mac: str | None = None,
+    ) -> VentilationDeviceContext:
+        return cls(
+            entry_id,
+            coordinator,
+            commands,
+            DeviceInfo(
+                identifiers={(DOMAIN, entry_id)},
+                connections={(CONNECTION_NETWORK_MAC, mac)} if mac else set(),
+                name="Fraenkische Ventilation",
+                manufacturer="Fraenkische Rohrwerke",
+                model="profi-air",
+                configuration_url=f"http://{ip_address}/",
+            ),
+        )
+
+    def unique_id(self, suffix: str) -> str:
+        return f"{self.entry_id}_{suffix}"
+
+
+@callback
+def async_enabled_descriptions(
+    hass: HomeAssistant,
+    platform: str,
+    device: VentilationDeviceContext,
+    descriptions: Iterable[_DescriptionT],
+    unique_id_suffix: str = "",
+) -> Iterator[_DescriptionT]:
+    """Skip descriptions whose entity the user left disabled.
+
+    Entities that are not registered yet are still created once so that
+    Home Assistant registers them, disabled by default where requested.
+    Enabling one later reloads the entry, which then builds it.
+    """
+    registry = er.async_get(hass)
+    for description in descriptions:
+        entity_id = registry.async_get_entity_id(
+            platform, DOMAIN, device.unique_id(f"{description.key}{unique_id_suffix}")
+        )
+        if entity_id is not None:
+            entry = registry.async_get(entity_id)
+            if entry is not None and entry.disabled:
+                continue
+        yield description
+
+
+class VentilationEntity(CoordinatorEntity[VentilationDataCoordinator]):
+    """Base entity that keeps showing the last snapshot while it is stale.
+
+    That is a snapshot restored from storage until the first poll, or the
+    last one fetched while the controller does not answer.
+    """
+
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        device: VentilationDeviceContext,
+        unique_id_suffix: str,
+        context: str | None,
+    ) -> None:
+        super().__init__(device.coordinator, context)
+        self._attr_unique_id = device.unique_id(unique_id_suffix)
+        self._attr_device_info = device.device_info
+
+    @property
+    def available(self) -> bool:
+        return super().available or (
+            self.coordinator.stale and self.coordinator.data is not None
+        )
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        if not self.coordinator.stale:
+            return None
+        attributes: dict[str, Any] = {"stale": True}
+        if (last_good := self.coordinator.last_good_update) is not None:
+            attributes["last_good_update"] = last_good.isoformat()
+        return attributes
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from enum import StrEnum
+import re
+from typing import Any
+
+Converter = Callable[[str | None], Any]
+
+STAGE_RE = re.compile(r"stufe\s*(\d+)", re.IGNORECASE)
+
+
+class FieldType(StrEnum):
+    """How a status.xml value is decoded."""
+
+    TEXT = "text"
+    ENUM = "enum"
+    STAGE = "stage"
+    TEMPERATURE = "temperature"
+    DAYS = "days"
+    HOURS = "hours"
+    MINUTES = "minutes"
+    SPEED = "speed"
+    PERCENT = "percent"
+    SWITCH = "switch"
+    FLAG = "flag"
+
+
+@dataclass(frozen=True, slots=True)
+class FieldSpec:
+    """Declarative description of one status.xml value."""
+
+    tag: str
+    type: FieldType
+    # Unit suffix some firmware versions append to the number.
+    unit: str | None = None
+    # ENUM: known texts mapped to the canonical value reported for them.
+    options: Mapping[str, str] | None = None
+    # FLAG: text whose presence sets the flag.
+    marker: str | None = None
+
+
+BYPASS_STATES = {
+    "Auto: Zu": "auto_closed",
+    "Auto: Auf": "auto_open",
+    "Hand: Zu": "manual_closed",
+    "Hand: Auf": "manual_open",
+    "Zu": "closed",
+    "Auf": "open",
+}
+BYPASS_OPEN = frozenset({"auto_open", "manual_open", "open"})
+
+# Snapshot attribute -> spec
+FIELD_SPECS: dict[str, FieldSpec] = {
+    "aktuell0": FieldSpec("aktuell0", FieldType.STAGE),
+    # Only "manuelle Stufenwahl" is known; other modes are shown as sent.
+    "control0": FieldSpec("control0", FieldType.TEXT),
+    "bypass": FieldSpec("bypass", FieldType.ENUM, options=BYPASS_STATES),
+    "rest_time": FieldSpec("rest_time", FieldType.DAYS, "Tage"),
+    "filtertime": FieldSpec("filtertime", FieldType.DAYS, "Tage"),
+    "filter0": FieldSpec("filter0", FieldType.TEXT),
+    "events": FieldSpec("events", FieldType.TEXT),
+    "abl0": FieldSpec("abl0", FieldType.TEMPERATURE, "°C"),
+    "zul0": FieldSpec("zul0", FieldType.TEMPERATURE, "°C"),
+    "aul0": FieldSpec("aul0", FieldType.TEMPERATURE, "°C"),
+    "fol0": FieldSpec("fol0", FieldType.TEMPERATURE, "°C"),
+    "BsSt1": FieldSpec("BsSt1", FieldType.HOURS, "h"),
+    "BsSt2": FieldSpec("BsSt2", FieldType.HOURS, "h"),
+    "BsSt3": FieldSpec("BsSt3", FieldType.HOURS, "h"),
+    "BsSt4": FieldSpec("BsSt4", FieldType.HOURS, "h"),
+    "partytime": FieldSpec("partytime", FieldType.MINUTES, "min"),
+    "BipaAutAUL": FieldSpec("BipaAutAUL", FieldType.TEMPERATURE, "°C"),
+    "BipaAutABL": FieldSpec("BipaAutABL", FieldType.TEMPERATURE, "°C"),
+    "filter_replacement_needed": FieldSpec(
+        "filter0", FieldType.FLAG, marker="filterwechsel"
+    ),
+    "DiIn1": FieldSpec("DiIn1", FieldType.SWITCH),
+    "DiIn2": FieldSpec("DiIn2", FieldType.SWITCH),
+    "DiIn3": FieldSpec("DiIn3", FieldType.SWITCH),
+    "MoStZlUm": FieldSpec("MoStZlUm", FieldType.SPEED),
+    "MoStAlUm": FieldSpec("MoStAlUm", FieldType.SPEED),
+    "MoStZlVo": FieldSpec("MoStZlVo", FieldType.PERCENT),
+    "MoStAlVo": FieldSpec("MoStAlVo", FieldType.PERCENT),
+    # Air volume configured for each stage, supply and exhaust.
+    **{
+        f"st{stage}{side}": FieldSpec(f"st{stage}{side}", FieldType.PERCENT)
+        for stage in range(1, 5)
+        for side in ("z", "a")
+    },
+}
+
+
+def _text(raw: str | None) -> str | None:
+    return (raw.strip() or None) if raw else None
+
+
+def _number(cast: Callable[[Any], Any], unit: str | None) -> Converter:
+    suffix = unit or ""
+    cut = len(suffix)
+
+    def convert(raw: str | None) -> Any:
+        if not raw:
+            return None
+        text = raw.strip()
+        if cut and text.endswith(suffix):
+            text = text[:-cut].rstrip()
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+        try:
+            return cast(float(text.replace(",", ".")))
+        except ValueError:
+            return None
+
+    return convert
+
+
+def _enum(options: Mapping[str, str]) -> Converter:
+    folded = {
+        " ".join(text.split()).casefold(): value for text, value in options.items()
+    }
+
+    def convert(raw: str | None) -> str | None:
+        """Return the canonical value of a known text, otherwise None."""
+        if not raw:
+            return None
+        text = raw.strip()
+        if (value := options.get(text)) is not None:
+            return value
+        return folded.get(" ".join(text.split()).casefold())
+
+    return convert
+
+
+def _stage(unit: str | None) -> Converter:
+    number = _number(int, unit)
+
+    def convert(raw: str | None) -> int | None:
+        if not raw:
+            return None
+        if (match := STAGE_RE.search(raw)) is not None:
+            return int(match.group(1))
+        return number(raw)
+
+    return convert
+
+
+def _switch(raw: str | None) -> bool | None:
+    text = _text(raw)
+    if text is None:
+        return None
+    return text.casefold() == "ein"
+
+
+def _flag(marker: str) -> Converter:
+    def convert(raw: str | None) -> bool:
+        return marker in raw.casefold() if raw else False
+
+    return convert
+
+
+def compile_field(spec: FieldSpec) -> Converter:
+    """Build the converter for one spec."""
+    if spec.type is FieldType.TEXT:
+        return _text
+    if spec.type is FieldType.ENUM:
+        return _enum(spec.options or {})
+    if spec.type is FieldType.STAGE:
+        return _stage(spec.unit)
+    if spec.type is FieldType.TEMPERATURE:
+        return _number(float, spec.unit)
+    if spec.type in (
+        FieldType.DAYS,
+        FieldType.HOURS,
+        FieldType.MINUTES,
+        FieldType.SPEED,
+        FieldType.PERCENT,
+    ):
+        return _number(int, spec.unit)
+    if spec.type is FieldType.SWITCH:
+        return _switch
+    if spec.type is FieldType.FLAG:
+        return _flag((spec.marker or "").casefold())
+    raise ValueError(f"Unsupported field type: {spec.type}")
+
+
+def compile_fields(
+    specs: Mapping[str, FieldSpec],
+) -> dict[str, tuple[str, Converter]]:
+    """Compile specs into an attribute -> (tag, converter) dispatch table."""
+    return {attr: (spec.tag, compile_field(spec)) for attr, spec in specs.items()}
+
+
+CONVERTERS = compile_fields(FIELD_SPECS)
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, Sequence
+from datetime import datetime, timezone
+from typing import Any
+
+from .status import VentilationStatus
+
+HISTORY_FIELDS = ("abl0", "zul0", "aul0", "fol0", "BsSt1", "BsSt2", "BsSt3", "BsSt4")
+
+# Resolution name -> (bucket width in seconds, buckets kept); 24 h each.
+RESOLUTIONS: dict[str, tuple[int, int]] = {
+    "1m": (60, 1440),
+    "15m": (900, 96),
+    "1h": (3600, 24),
+}
+
+
+class RollupRing:
+    """Fixed-size ring of min/max/mean buckets at one resolution.
+
+    Samples are folded into the open bucket and written to the preallocated
+    arrays when the next bucket starts, so adding a sample is O(1) and the
+    memory use never grows.
+    """
+
+    __slots__ = (
+        "width",
+        "size",
+        "buckets",
+        "minimum",
+        "maximum",
+        "mean",
+        "_head",
+        "_filled",
+        "_bucket",
+        "_min",
+        "_max",
+        "_sum",
+        "_count",
+    )
+
+    def __init__(self, width: int, size: int) -> None:
+        self.width = width
+        self.size = size
+        self.buckets = array("I", bytes(4 * size))
+        self.minimum = array("f", bytes(4 * size))
+        self.maximum = array("f", bytes(4 * size))
+        self.mean = array("f", bytes(4 * size))
+        self._head = 0
+        self._filled = 0
+        self._bucket = -1
+        self._min = self._max = self._sum = 0.0
+        self._count = 0
+
+    def add(self, timestamp: float, value: float) -> None:
+        bucket = int(timestamp // self.width)
+        if bucket != self._bucket:
+            self._commit()
+            self._bucket = bucket
+            self._min = self._max = self._sum = value
+            self._count = 1
+            return
+        if value < self._min:
+            self._min = value
+        elif value > self._max:
+            self._max = value
+        self._sum += value
+        self._count += 1
+
+    def _commit(self) -> None:
+        if not self._count:
+            return
+        head = self._head
+        self.buckets[head] = self._bucket
+        self.minimum[head] = self._min
+        self.maximum[head] = self._max
+        self.mean[head] = self._sum / self._count
+        self._head = (head + 1) % self.size
+        self._filled = min(self._filled + 1, self.size)
+
+    def rows(self) -> list[tuple[float, float, float, float]]:
+        """Return (start, min, max, mean) rows, oldest first, incl. the open bucket."""
+        first = (self._head - self._filled) % self.size
+        rows = [
+            (
+                float(self.buckets[idx] * self.width),
+                self.minimum[idx],
+                self.maximum[idx],
+                self.mean[idx],
+            )
+            for idx in ((first + offset) % self.size for offset in range(self._filled))
+        ]
+        if self._count:
+            rows.append(
+                (
+                    float(self._bucket * self.width),
+                    self._min,
+                    self._max,
+                    self._sum / self._count,
+                )
+            )
+        # The open bucket may be one the ring already evicted at full capacity.
+        return rows[-self.size :]
+
+
+class VentilationHistory:
+    """Rolling 24 h history of temperature and runtime values for one controller."""
+
+    def __init__(self, fields: Iterable[str] = HISTORY_FIELDS) -> None:
+        self._series: dict[str, dict[str, RollupRing]] = {
+            field: {
+                name: RollupRing(width, size)
+                for name, (width, size) in RESOLUTIONS.items()
+            }
+            for field in fields
+        }
+
+    @property
+    def fields(self) -> list[str]:
+        return list(self._series)
+
+    def add(self, timestamp: float, status: VentilationStatus) -> None:
+        for field, rings in self._series.items():
+            value = status.get(field)
+            if value is None:
+                continue
+            for ring in rings.values():
+                ring.add(timestamp, value)
+
+    def ring(self, field: str, resolution: str) -> RollupRing:
+        return self._series[field][resolution]
+
+    def columns(self, fields: Sequence[str], resolution: str) -> list[list[float]]:
+        """Return the bucket means of several fields, aligned on bucket start."""
+        means = [
+            {row[0]: row[3] for row in self._series[field][resolution].rows()}
+            for field in fields
+        ]
+        starts = sorted(set(means[0]).intersection(*means[1:]))
+        return [list(map(mean.__getitem__, starts)) for mean in means]
+
+    def as_dict(
+        self,
+        resolutions: Iterable[str] | None = None,
+        fields: Iterable[str] | None = None,
+    ) -> dict[str, dict[str, list[dict[str, Any]]]]:
+        """Return the rollups as JSON-serializable rows."""
+        selected = list(resolutions or RESOLUTIONS)
+        return {
+            field: {
+                resolution: [
+                    {
+                        "start": datetime.fromtimestamp(start, timezone.utc).isoformat(),
+                        "min": round(minimum, 3),
+                        "max": round(maximum, 3),
+                        "mean": round(mean, 3),
+                    }
+                    for start, minimum, maximum, mean in self._series[field][
+                        resolution
+                    ].rows()
+                ]
+                for resolution in selected
+            }
+            for field in (fields or self._series)
+            if field in self._series
+        }
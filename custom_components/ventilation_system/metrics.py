@@ -0,0 +1,90 @@
+"""Heat recovery metrics derived from the four air temperatures.
+
+``aul0`` is the outdoor air entering the unit, ``zul0`` the supply air after
+the heat exchanger, ``abl0`` the exhaust air drawn from the rooms and
+``fol0`` the air leaving the building.
+"""
+from __future__ import annotations
+
+from collections.abc import Sequence
+import math
+
+from .fields import BYPASS_OPEN
+
+# Below this outdoor/exhaust spread the ratios are dominated by sensor noise.
+MIN_TEMPERATURE_SPREAD = 1.0
+
+ROLLING_FIELDS = ("heat_recovery_efficiency_24h", "heat_recovery_gain_24h")
+
+
+def heat_recovery_efficiency(
+    aul: float | None, zul: float | None, abl: float | None
+) -> float | None:
+    """Return the supply side temperature efficiency in percent."""
+    if aul is None or zul is None or abl is None:
+        return None
+    spread = abl - aul
+    if abs(spread) < MIN_TEMPERATURE_SPREAD:
+        return None
+    return round((zul - aul) / spread * 100, 1)
+
+
+def heat_recovery_gain(aul: float | None, zul: float | None) -> float | None:
+    """Return the temperature the supply air gained in the exchanger."""
+    if aul is None or zul is None:
+        return None
+    return round(zul - aul, 1)
+
+
+def bypass_effectiveness(
+    aul: float | None, zul: float | None, abl: float | None, bypass: str | None
+) -> float | None:
+    """Return how much of the heat exchange the open bypass avoids, in percent."""
+    if not is_bypass_open(bypass):
+        return None
+    efficiency = heat_recovery_efficiency(aul, zul, abl)
+    if efficiency is None:
+        return None
+    return round(100 - efficiency, 1)
+
+
+def air_volume_balance(supply: int | None, exhaust: int | None) -> int | None:
+    """Return by how many percentage points the supply exceeds the exhaust."""
+    if supply is None or exhaust is None:
+        return None
+    return supply - exhaust
+
+
+def is_bypass_open(bypass: str | None) -> bool:
+    """Interpret the canonical bypass state, e.g. ``auto_open`` or ``closed``."""
+    return bypass in BYPASS_OPEN
+
+
+def rolling_metrics(
+    aul: Sequence[float], zul: Sequence[float], abl: Sequence[float]
+) -> dict[str, float | None]:
+    """Aggregate aligned temperature columns into window metrics.
+
+    The efficiency is the least squares slope of the supply gain against the
+    outdoor/exhaust spread. It is expanded into dot products of the input
+    columns so every sum runs over the whole window in C; a window whose mean
+    squared spread is below ``MIN_TEMPERATURE_SPREAD`` squared is unknown.
+    """
+    count = len(aul)
+    if not count:
+        return dict.fromkeys(ROLLING_FIELDS)
+    sumprod = math.sumprod
+    aul_aul = sumprod(aul, aul)
+    aul_abl = sumprod(aul, abl)
+    covariance = sumprod(zul, abl) - sumprod(zul, aul) - aul_abl + aul_aul
+    variance = sumprod(abl, abl) - 2 * aul_abl + aul_aul
+    return {
+        "heat_recovery_efficiency_24h": (
+            round(covariance / variance * 100, 1)
+            if variance >= MIN_TEMPERATURE_SPREAD**2 * count
+            else None
+        ),
+        "heat_recovery_gain_24h": round(
+            (math.fsum(zul) - math.fsum(aul)) / count, 1
+        ),
+    }
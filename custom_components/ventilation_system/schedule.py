@@ -0,0 +1,89 @@
+"""Read model of the week programs the controller reports in status.xml.
+
+Slot ``n`` is described by ``prg<n>`` (``Stufe 2`` or ``Aus``), the
+``prg_start<n>``/``prg_stop<n>`` times and ``prg_wota<n>``, the comma
+separated German weekday abbreviations or ``-`` for none.
+"""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import time as dt_time
+from typing import Any
+
+from .fields import STAGE_RE
+
+PROGRAM_SLOTS = range(1, 11)
+WEEKDAYS = ("Mo", "Di", "Mi", "Do", "Fr", "Sa", "So")
+SCHEDULE_TAGS = frozenset(
+    f"{prefix}{slot}"
+    for slot in PROGRAM_SLOTS
+    for prefix in ("prg", "prg_start", "prg_stop", "prg_wota")
+)
+
+
+@dataclass(frozen=True, slots=True)
+class WeekProgram:
+    """One program slot; without a stage or days it never runs."""
+
+    program: int
+    stage: int | None
+    start: dt_time
+    stop: dt_time
+    # ISO weekday numbers, 1 is Monday.
+    days: frozenset[int]
+
+    @property
+    def active(self) -> bool:
+        return self.stage is not None and bool(self.days)
+
+    def matches(self, other: WeekProgram) -> bool:
+        """Return whether writing ``other`` over this slot would change nothing."""
+        if not self.active and not other.active:
+            return self.program == other.program
+        return self == other
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "program": self.program,
+            "stage": self.stage,
+            "start": self.start.strftime("%H:%M"),
+            "stop": self.stop.strftime("%H:%M"),
+            "days": sorted(self.days),
+            "active": self.active,
+        }
+
+
+def _parse_time(text: str) -> dt_time:
+    hour, _, minute = text.strip().partition(":")
+    return dt_time(int(hour), int(minute))
+
+
+def _parse_days(text: str) -> frozenset[int]:
+    return frozenset(
+        WEEKDAYS.index(name) + 1
+        for name in (part.strip() for part in text.split(","))
+        if name in WEEKDAYS
+    )
+
+
+def parse_week_schedule(raw: Mapping[str, str]) -> dict[int, WeekProgram]:
+    """Build the programs from the status values, skipping unreadable slots."""
+    programs: dict[int, WeekProgram] = {}
+    for slot in PROGRAM_SLOTS:
+        if (stage_text := raw.get(f"prg{slot}")) is None:
+            continue
+        try:
+            start = _parse_time(raw.get(f"prg_start{slot}", ""))
+            stop = _parse_time(raw.get(f"prg_stop{slot}", ""))
+        except ValueError:
+            continue
+        match = STAGE_RE.search(stage_text)
+        programs[slot] = WeekProgram(
+            slot,
+            int(match.group(1)) if match else None,
+            start,
+            stop,
+            _parse_days(raw.get(f"prg_wota{slot}", "")),
+        )
+    return programs
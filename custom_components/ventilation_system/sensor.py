@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Callable
+from typing import Any
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
@@ -10,200 +10,273 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import UnitOfTemperature, UnitOfTime
+from homeassistant.const import (
+    PERCENTAGE,
+    REVOLUTIONS_PER_MINUTE,
+    EntityCategory,
+    Platform,
+    UnitOfTemperature,
+    UnitOfTime,
+)
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import CONF_IP_ADDRESS, DATA_COORDINATOR, DOMAIN
-from .coordinator import VentilationDataCoordinator
-from .parser import as_float, as_int, stage_value, value_as_text
+from .const import DATA_DEVICE, DOMAIN
+from .entity import (
+    VentilationDeviceContext,
+    VentilationEntity,
+    async_enabled_descriptions,
+)
+from .fields import FIELD_SPECS, FieldType
+from .status import VentilationStatus
+from .timing import TimingHistogram
 
 
 @dataclass
 class VentilationSensorEntityDescription(SensorEntityDescription):
-    value_fn: Callable[[dict[str, str]], Any] | None = None
-    value_transform: Callable[[Any], Any] | None = None
+    def value_from(self, status: VentilationStatus) -> Any:
+        return status.get(self.key)
+
+
+# Entity metadata implied by the type of the status field a sensor shows.
+FIELD_TYPE_METADATA: dict[FieldType, dict[str, Any]] = {
+    FieldType.ENUM: {"device_class": SensorDeviceClass.ENUM},
+    FieldType.TEMPERATURE: {
+        "device_class": SensorDeviceClass.TEMPERATURE,
+        "native_unit_of_measurement": UnitOfTemperature.CELSIUS,
+        "state_class": SensorStateClass.MEASUREMENT,
+    },
+    FieldType.DAYS: {
+        "device_class": SensorDeviceClass.DURATION,
+        "native_unit_of_measurement": UnitOfTime.DAYS,
+        "state_class": SensorStateClass.MEASUREMENT,
+    },
+    FieldType.HOURS: {
+        "device_class": SensorDeviceClass.DURATION,
+        "native_unit_of_measurement": UnitOfTime.HOURS,
+        "state_class": SensorStateClass.TOTAL_INCREASING,
+    },
+    FieldType.MINUTES: {
+        "device_class": SensorDeviceClass.DURATION,
+        "native_unit_of_measurement": UnitOfTime.MINUTES,
+    },
+    FieldType.SPEED: {
+        "icon": "mdi:fan",
+        "native_unit_of_measurement": REVOLUTIONS_PER_MINUTE,
+        "state_class": SensorStateClass.MEASUREMENT,
+    },
+    FieldType.PERCENT: {
+        "icon": "mdi:weather-windy",
+        "native_unit_of_measurement": PERCENTAGE,
+        "state_class": SensorStateClass.MEASUREMENT,
+    },
+}
 
-    def value_from(self, data: dict[str, str]) -> Any:
-        if self.value_fn:
-            return self.value_fn(data)
-        value = data.get(self.key)
-        if self.value_transform:
-            return self.value_transform(value)
-        return value_as_text(value)
+
+def _field_sensor(
+    key: str, name: str, **kwargs: Any
+) -> VentilationSensorEntityDescription:
+    """Describe a sensor for a status field, taking defaults from its spec."""
+    spec = FIELD_SPECS[key]
+    metadata = FIELD_TYPE_METADATA.get(spec.type, {})
+    if spec.options:
+        metadata = {**metadata, "options": list(dict.fromkeys(spec.options.values()))}
+    return VentilationSensorEntityDescription(
+        key=key, name=name, **{**metadata, **kwargs}
+    )
 
 
 SENSORS: tuple[VentilationSensorEntityDescription, ...] = (
-    VentilationSensorEntityDescription(
-        key="aktuell0",
-        name="Ventilation Stage",
-        icon="mdi:fan-speed-1",
-        value_transform=stage_value,
+    _field_sensor("aktuell0", "Ventilation Stage", icon="mdi:fan-speed-1"),
+    _field_sensor("control0", "Control Mode", icon="mdi:hand-back-left"),
+    _field_sensor("bypass", "Bypass Status", icon="mdi:cached"),
+    _field_sensor("rest_time", "Filter Remaining Time"),
+    _field_sensor(
+        "filtertime", "Filter Interval", entity_registry_enabled_default=False
     ),
-    VentilationSensorEntityDescription(
-        key="control0",
-        name="Control Mode",
-        icon="mdi:hand-back-left",
-    ),
-    VentilationSensorEntityDescription(
-        key="bypass",
-        name="Bypass Status",
-        icon="mdi:cached",
-    ),
-    VentilationSensorEntityDescription(
-        key="rest_time",
-        name="Filter Remaining Time",
-        native_unit_of_measurement=UnitOfTime.DAYS,
-        device_class=SensorDeviceClass.DURATION,
-        state_class=SensorStateClass.MEASUREMENT,
-        value_transform=as_int,
+    _field_sensor("filter0", "Filter Status Text", icon="mdi:air-filter"),
+    _field_sensor("events", "Controller Events", icon="mdi:alert"),
+    _field_sensor("abl0", "Exhaust Air Temperature"),
+    _field_sensor("zul0", "Supply Air Temperature"),
+    _field_sensor("aul0", "Outdoor Air Temperature"),
+    _field_sensor("fol0", "Exhausted Air Temperature"),
+    *(
+        _field_sensor(
+            f"BsSt{stage}",
+            f"Runtime Stage {stage}",
+            entity_registry_enabled_default=False,
+        )
+        for stage in range(1, 5)
     ),
-    VentilationSensorEntityDescription(
-        key="filtertime",
-        name="Filter Interval",
-        native_unit_of_measurement=UnitOfTime.DAYS,
-        device_class=SensorDeviceClass.DURATION,
-        state_class=SensorStateClass.MEASUREMENT,
-        value_transform=as_int,
+    _field_sensor("partytime", "Party Mode Duration"),
+    # Thresholds are settings, not measurements to keep statistics for.
+    _field_sensor(
+        "BipaAutAUL",
+        "Bypass Outdoor Threshold",
+        state_class=None,
+        entity_registry_enabled_default=False,
     ),
-    VentilationSensorEntityDescription(
-        key="filter0",
-        name="Filter Status Text",
-        icon="mdi:air-filter",
+    _field_sensor(
+        "BipaAutABL",
+        "Bypass Exhaust Threshold",
+        state_class=None,
+        entity_registry_enabled_default=False,
     ),
-    VentilationSensorEntityDescription(
-        key="events",
-        name="Controller Events",
-        icon="mdi:alert",
+    _field_sensor("MoStZlUm", "Supply Fan Speed"),
+    _field_sensor("MoStAlUm", "Exhaust Fan Speed"),
+    _field_sensor("MoStZlVo", "Supply Air Volume"),
+    _field_sensor("MoStAlVo", "Exhaust Air Volume"),
+    # Configured volumes per stage; settings like the bypass thresholds.
+    *(
+        _field_sensor(
+            f"st{stage}{side}",
+            f"Stage {stage} {name} Air Volume",
+            state_class=None,
+            entity_registry_enabled_default=False,
+        )
+        for stage in range(1, 5)
+        for side, name in (("z", "Supply"), ("a", "Exhaust"))
     ),
     VentilationSensorEntityDescription(
-        key="abl0",
-        name="Exhaust Air Temperature",
-        device_class=SensorDeviceClass.TEMPERATURE,
-        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        key="air_volume_balance",
+        name="Air Volume Balance",
+        icon="mdi:scale-balance",
+        native_unit_of_measurement=PERCENTAGE,
         state_class=SensorStateClass.MEASUREMENT,
-        value_transform=as_float,
     ),
     VentilationSensorEntityDescription(
-        key="zul0",
-        name="Supply Air Temperature",
-        device_class=SensorDeviceClass.TEMPERATURE,
-        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        key="heat_recovery_efficiency",
+        name="Heat Recovery Efficiency",
+        icon="mdi:heat-wave",
+        native_unit_of_measurement=PERCENTAGE,
         state_class=SensorStateClass.MEASUREMENT,
-        value_transform=as_float,
     ),
     VentilationSensorEntityDescription(
-        key="aul0",
-        name="Outdoor Air Temperature",
-        device_class=SensorDeviceClass.TEMPERATURE,
-        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        key="heat_recovery_gain",
+        name="Heat Recovery Temperature Gain",
+        icon="mdi:thermometer-plus",
+        native_unit_of_measurement=UnitOfTemperature.KELVIN,
         state_class=SensorStateClass.MEASUREMENT,
-        value_transform=as_float,
     ),
     VentilationSensorEntityDescription(
-        key="fol0",
-        name="Exhausted Air Temperature",
-        device_class=SensorDeviceClass.TEMPERATURE,
-        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        key="bypass_effectiveness",
+        name="Bypass Effectiveness",
+        icon="mdi:cached",
+        native_unit_of_measurement=PERCENTAGE,
         state_class=SensorStateClass.MEASUREMENT,
-        value_transform=as_float,
-    ),
-    VentilationSensorEntityDescription(
-        key="BsSt1",
-        name="Runtime Stage 1",
-        native_unit_of_measurement=UnitOfTime.HOURS,
-        device_class=SensorDeviceClass.DURATION,
-        state_class=SensorStateClass.TOTAL_INCREASING,
-        value_transform=as_int,
     ),
     VentilationSensorEntityDescription(
-        key="BsSt2",
-        name="Runtime Stage 2",
-        native_unit_of_measurement=UnitOfTime.HOURS,
-        device_class=SensorDeviceClass.DURATION,
-        state_class=SensorStateClass.TOTAL_INCREASING,
-        value_transform=as_int,
+        key="heat_recovery_efficiency_24h",
+        name="Heat Recovery Efficiency (24 h)",
+        icon="mdi:heat-wave",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
     ),
     VentilationSensorEntityDescription(
-        key="BsSt3",
-        name="Runtime Stage 3",
-        native_unit_of_measurement=UnitOfTime.HOURS,
-        device_class=SensorDeviceClass.DURATION,
-        state_class=SensorStateClass.TOTAL_INCREASING,
-        value_transform=as_int,
+        key="heat_recovery_gain_24h",
+        name="Heat Recovery Temperature Gain (24 h)",
+        icon="mdi:thermometer-plus",
+        native_unit_of_measurement=UnitOfTemperature.KELVIN,
+        state_class=SensorStateClass.MEASUREMENT,
     ),
     VentilationSensorEntityDescription(
-        key="BsSt4",
-        name="Runtime Stage 4",
-        native_unit_of_measurement=UnitOfTime.HOURS,
+        key="clock_drift",
+        name="Controller Clock Drift",
+        icon="mdi:clock-alert-outline",
         device_class=SensorDeviceClass.DURATION,
-        state_class=SensorStateClass.TOTAL_INCREASING,
-        value_transform=as_int,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
     ),
-    VentilationSensorEntityDescription(
-        key="partytime",
-        name="Party Mode Duration",
-        native_unit_of_measurement=UnitOfTime.MINUTES,
+)
+
+
+TIMING_SENSORS: tuple[SensorEntityDescription, ...] = tuple(
+    SensorEntityDescription(
+        key=f"timing_{stage}",
+        name=name,
+        icon="mdi:timer-outline",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
         device_class=SensorDeviceClass.DURATION,
-        value_transform=as_int,
-    ),
-    VentilationSensorEntityDescription(
-        key="BipaAutAUL",
-        name="Bypass Outdoor Threshold",
-        device_class=SensorDeviceClass.TEMPERATURE,
-        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-        value_transform=as_float,
-    ),
-    VentilationSensorEntityDescription(
-        key="BipaAutABL",
-        name="Bypass Exhaust Threshold",
-        device_class=SensorDeviceClass.TEMPERATURE,
-        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
-        value_transform=as_float,
-    ),
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    )
+    for stage, name in (
+        ("connect", "Connect Time"),
+        ("first_byte", "Time to First Byte"),
+        ("body", "Body Read Time"),
+        ("parse", "Parse Time"),
+        ("dispatch", "Dispatch Time"),
+        ("command", "Command Time"),
+    )
 )
 
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
-    entry_data = hass.data[DOMAIN][entry.entry_id]
-    coordinator: VentilationDataCoordinator = entry_data[DATA_COORDINATOR]
-
+    device: VentilationDeviceContext = hass.data[DOMAIN][entry.entry_id][DATA_DEVICE]
     async_add_entities(
-        VentilationSystemSensor(
-            coordinator, entry.entry_id, entry.data[CONF_IP_ADDRESS], description
+        VentilationSystemSensor(device, description)
+        for description in async_enabled_descriptions(
+            hass, Platform.SENSOR, device, SENSORS
         )
-        for description in SENSORS
     )
+    timing = device.coordinator.transport.timing
+    if timing.enabled:
+        async_add_entities(
+            VentilationTimingSensor(
+                device,
+                description,
+                timing.histograms[description.key.removeprefix("timing_")],
+            )
+            for description in async_enabled_descriptions(
+                hass, Platform.SENSOR, device, TIMING_SENSORS
+            )
+        )
 
 
-class VentilationSystemSensor(CoordinatorEntity[VentilationDataCoordinator], SensorEntity):
-    _attr_has_entity_name = True
+class VentilationSystemSensor(VentilationEntity, SensorEntity):
+    entity_description: VentilationSensorEntityDescription
 
     def __init__(
         self,
-        coordinator: VentilationDataCoordinator,
-        entry_id: str,
-        ip_address: str,
+        device: VentilationDeviceContext,
         description: VentilationSensorEntityDescription,
     ) -> None:
-        super().__init__(coordinator)
+        super().__init__(device, description.key, description.key)
         self.entity_description = description
-        self._entry_id = entry_id
-        self._attr_unique_id = f"{entry_id}_{description.key}"
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, entry_id)},
-            name="Fraenkische Ventilation",
-            manufacturer="Fraenkische Rohrwerke",
-            model="profi-air",
-            configuration_url=f"http://{ip_address}/",
-        )
 
     @property
     def native_value(self) -> Any:
         if not self.coordinator.data:
             return None
         return self.entity_description.value_from(self.coordinator.data)
+
+
+class VentilationTimingSensor(VentilationEntity, SensorEntity):
+    """Median latency of one stage, refreshed with every poll."""
+
+    def __init__(
+        self,
+        device: VentilationDeviceContext,
+        description: SensorEntityDescription,
+        histogram: TimingHistogram,
+    ) -> None:
+        # No listener context: the histograms change even when the status does not.
+        super().__init__(device, description.key, None)
+        self.entity_description = description
+        self._histogram = histogram
+
+    @property
+    def native_value(self) -> float | None:
+        return self._histogram.percentile(0.5)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        return {
+            **(super().extra_state_attributes or {}),
+            "p95": self._histogram.percentile(0.95),
+            "maximum": round(self._histogram.maximum, 2),
+            "samples": self._histogram.count,
+        }
@@ -0,0 +1,529 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import time as dt_time
+from functools import partial
+import time
+from typing import Any
+
+import voluptuous as vol
+from aiohttp import FormData
+from homeassistant.core import (
+    Event,
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv, entity_registry as er
+from homeassistant.helpers.service import async_extract_referenced_entity_ids
+
+from .commands import VentilationCommand, VentilationCommandQueue
+from .const import (
+    CONF_IP_ADDRESS,
+    DATA_COMMANDS,
+    DATA_COORDINATOR,
+    DATA_ENTITY_INDEX,
+    DOMAIN,
+    SERVICE_GET_FAN_TELEMETRY,
+    SERVICE_GET_HISTORY,
+    SERVICE_SET_BYPASS_MODE,
+    SERVICE_SET_STAGE,
+    SERVICE_SET_WEEK_PROGRAM,
+    SERVICE_GET_WEEK_SCHEDULE,
+    SERVICE_SET_WEEK_PROGRAMS,
+    SERVICE_SYNC_WEEK_SCHEDULE,
+)
+from .coordinator import VentilationDataCoordinator
+from .history import HISTORY_FIELDS, RESOLUTIONS
+from .schedule import WeekProgram
+
+BYPASS_MODES = {
+    "manual_open": "bypa0",
+    "manual_close": "bypa1",
+    "auto": "bypa2",
+}
+
+WEEKDAY_VALUE = {
+    "mon": "1",
+    "tue": "2",
+    "wed": "3",
+    "thu": "4",
+    "fri": "5",
+    "sat": "6",
+    "sun": "7",
+}
+
+WEEK_PROGRAM_FIELDS = {
+    vol.Required("program"): vol.All(vol.Coerce(int), vol.Range(min=1, max=10)),
+    vol.Required("stage"): vol.All(vol.Coerce(int), vol.Range(min=1, max=3)),
+    vol.Required("start"): cv.time,
+    vol.Required("stop"): cv.time,
+    vol.Required("days"): vol.All(
+        cv.ensure_list,
+        [
+            vol.Any(
+                vol.All(str, vol.Lower, vol.In(list(WEEKDAY_VALUE))),
+                vol.All(vol.Coerce(int), vol.In(range(1, 8))),
+            )
+        ],
+    ),
+}
+
+
+class EntityEntryIndex:
+    """Map entity IDs of this integration to their config entry IDs.
+
+    Built lazily from the entity registry and dropped whenever the registry
+    changes, so service calls resolve targets without a registry lookup per
+    entity.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass = hass
+        self._index: dict[str, str] | None = None
+
+    @callback
+    def async_invalidate(self, event: Event | None = None) -> None:
+        self._index = None
+
+    @callback
+    def async_entry_ids(self, entity_ids: set[str]) -> set[str]:
+        if self._index is None:
+            self._index = {
+                entity.entity_id: entity.config_entry_id
+                for entity in er.async_get(self._hass).entities.values()
+                if entity.platform == DOMAIN and entity.config_entry_id
+            }
+        return {
+            entry_id
+            for entity_id in entity_ids
+            if (entry_id := self._index.get(entity_id)) is not None
+        }
+
+
+def async_register_services(hass: HomeAssistant) -> None:
+    index = EntityEntryIndex(hass)
+    hass.data[DOMAIN][DATA_ENTITY_INDEX] = index
+    hass.bus.async_listen(er.EVENT_ENTITY_REGISTRY_UPDATED, index.async_invalidate)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_STAGE,
+        partial(_async_handle_set_stage, hass),
+        schema=cv.make_entity_service_schema(
+            {vol.Required("stage"): vol.All(vol.Coerce(int), vol.Range(min=1, max=4))}
+        ),
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_BYPASS_MODE,
+        partial(_async_handle_set_bypass_mode, hass),
+        schema=cv.make_entity_service_schema(
+            {vol.Required("mode"): vol.In(list(BYPASS_MODES))}
+        ),
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_WEEK_PROGRAM,
+        partial(_async_handle_set_week_program, hass),
+        schema=cv.make_entity_service_schema(WEEK_PROGRAM_FIELDS),
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    week_programs_schema = cv.make_entity_service_schema(
+        {
+            vol.Required("programs"): vol.All(
+                cv.ensure_list,
+                vol.Length(min=1, max=10),
+                [vol.Schema(WEEK_PROGRAM_FIELDS)],
+                _validate_week_programs,
+            ),
+        }
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_WEEK_PROGRAMS,
+        partial(_async_handle_set_week_programs, hass),
+        schema=week_programs_schema,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SYNC_WEEK_SCHEDULE,
+        partial(_async_handle_sync_week_schedule, hass),
+        schema=week_programs_schema,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_WEEK_SCHEDULE,
+        partial(_async_handle_get_week_schedule, hass),
+        schema=cv.make_entity_service_schema({}),
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_HISTORY,
+        partial(_async_handle_get_history, hass),
+        schema=cv.make_entity_service_schema(
+            {
+                vol.Optional("resolution"): vol.All(
+                    cv.ensure_list, [vol.In(list(RESOLUTIONS))]
+                ),
+                vol.Optional("fields"): vol.All(
+                    cv.ensure_list, [vol.In(HISTORY_FIELDS)]
+                ),
+            }
+        ),
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_FAN_TELEMETRY,
+        partial(_async_handle_get_fan_telemetry, hass),
+        schema=cv.make_entity_service_schema(
+            {
+                vol.Optional("hours", default=24): vol.All(
+                    vol.Coerce(float), vol.Range(min=0.1, max=168)
+                ),
+                vol.Optional("samples", default=False): cv.boolean,
+            }
+        ),
+        supports_response=SupportsResponse.ONLY,
+    )
+
+
+@callback
+def _async_get_target_entries(
+    hass: HomeAssistant, call: ServiceCall
+) -> dict[str, dict[str, Any]]:
+    """Resolve the entities, devices and areas targeted by a call to loaded entries."""
+    selected = async_extract_referenced_entity_ids(hass, call)
+    index: EntityEntryIndex = hass.data[DOMAIN][DATA_ENTITY_INDEX]
+    entry_ids = index.async_entry_ids(
+        selected.referenced | selected.indirectly_referenced
+    )
+    if not entry_ids:
+        raise HomeAssistantError(
+            "No ventilation system entities found for the selected targets"
+        )
+    entries: dict[str, dict[str, Any]] = {}
+    for entry_id in entry_ids:
+        entry_data = hass.data[DOMAIN].get(entry_id)
+        if not entry_data:
+            raise HomeAssistantError(f"Config entry {entry_id} is not loaded")
+        entries[entry_id] = entry_data
+    return entries
+
+
+async def _async_dispatch(
+    hass: HomeAssistant,
+    call: ServiceCall,
+    action: Callable[[dict[str, Any]], Awaitable[dict[str, Any] | None]],
+) -> ServiceResponse:
+    """Run a command on every targeted controller in parallel.
+
+    Returns per-controller results, extended by what the action returned,
+    when the caller asked for a response; otherwise any failure is raised.
+    """
+    entries = _async_get_target_entries(hass, call)
+    outcomes = await asyncio.gather(
+        *(action(entry_data) for entry_data in entries.values()),
+        return_exceptions=True,
+    )
+    results: dict[str, Any] = {}
+    failures: list[str] = []
+    for (entry_id, entry_data), outcome in zip(entries.items(), outcomes):
+        if isinstance(outcome, BaseException) and not isinstance(
+            outcome, HomeAssistantError
+        ):
+            raise outcome
+        host = entry_data[CONF_IP_ADDRESS]
+        failed = isinstance(outcome, HomeAssistantError)
+        results[entry_id] = {
+            "host": host,
+            "success": not failed,
+            "error": str(outcome) if failed else None,
+            **(outcome if isinstance(outcome, dict) else {}),
+        }
+        if failed:
+            failures.append(f"{host}: {outcome}")
+    if failures and not call.return_response:
+        raise HomeAssistantError("; ".join(failures))
+    return {"results": results} if call.return_response else None
+
+
+async def _async_handle_set_stage(
+    hass: HomeAssistant, call: ServiceCall
+) -> ServiceResponse:
+    stage = call.data["stage"]
+
+    async def set_stage(entry_data: dict[str, Any]) -> None:
+        await entry_data[DATA_COMMANDS].async_submit(
+            VentilationCommand("stage", "GET", f"/stufe.cgi?stufe={stage}")
+        )
+        entry_data[DATA_COORDINATOR].async_set_optimistic("aktuell0", stage)
+
+    return await _async_dispatch(hass, call, set_stage)
+
+
+async def _async_handle_set_bypass_mode(
+    hass: HomeAssistant, call: ServiceCall
+) -> ServiceResponse:
+    mode = call.data["mode"]
+
+    async def set_bypass_mode(entry_data: dict[str, Any]) -> None:
+        form = FormData()
+        form.add_field("bypassSt", BYPASS_MODES[mode])
+        await entry_data[DATA_COMMANDS].async_submit(
+            VentilationCommand("bypass", "POST", "/setup.htm", form)
+        )
+
+    return await _async_dispatch(hass, call, set_bypass_mode)
+
+
+async def _async_handle_set_week_program(
+    hass: HomeAssistant, call: ServiceCall
+) -> ServiceResponse:
+    program = call.data["program"]
+    stage = call.data["stage"]
+    start: dt_time = call.data["start"]
+    stop: dt_time = call.data["stop"]
+    day_values = _normalize_weekdays(call.data["days"])
+
+    async def set_week_program(entry_data: dict[str, Any]) -> None:
+        form = _build_week_program_payload(program, stage, start, stop, day_values)
+        await entry_data[DATA_COMMANDS].async_submit(
+            VentilationCommand(f"week_program_{program}", "POST", "/wopla.htm", form)
+        )
+
+    return await _async_dispatch(hass, call, set_week_program)
+
+
+async def _async_handle_set_week_programs(
+    hass: HomeAssistant, call: ServiceCall
+) -> ServiceResponse:
+    programs = call.data["programs"]
+
+    async def set_week_programs(entry_data: dict[str, Any]) -> None:
+        await _async_submit_week_programs(entry_data, programs)
+
+    return await _async_dispatch(hass, call, set_week_programs)
+
+
+async def _async_handle_sync_week_schedule(
+    hass: HomeAssistant, call: ServiceCall
+) -> ServiceResponse:
+    desired = [_week_program(program) for program in call.data["programs"]]
+
+    async def sync_week_schedule(entry_data: dict[str, Any]) -> dict[str, Any]:
+        coordinator: VentilationDataCoordinator = entry_data[DATA_COORDINATOR]
+        current = coordinator.week_schedule
+        changed = [
+            program
+            for program in desired
+            if program.program not in current
+            or not current[program.program].matches(program)
+        ]
+        if changed:
+            await _async_submit_week_programs(
+                entry_data,
+                [
+                    {
+                        "program": program.program,
+                        "stage": program.stage,
+                        "start": program.start,
+                        "stop": program.stop,
+                        "days": sorted(program.days),
+                    }
+                    for program in changed
+                ],
+            )
+            coordinator.async_note_week_programs(changed)
+        return {"updated": [program.program for program in changed]}
+
+    return await _async_dispatch(hass, call, sync_week_schedule)
+
+
+async def _async_submit_week_programs(
+    entry_data: dict[str, Any], programs: list[dict[str, Any]]
+) -> None:
+    queue: VentilationCommandQueue = entry_data[DATA_COMMANDS]
+    # Queued back-to-back so they go out over one connection and the
+    # coordinator refreshes once after the last one.
+    await asyncio.gather(
+        *(
+            queue.async_submit(
+                VentilationCommand(
+                    f"week_program_{program['program']}",
+                    "POST",
+                    "/wopla.htm",
+                    _build_week_program_payload(
+                        program["program"],
+                        program["stage"],
+                        program["start"],
+                        program["stop"],
+                        _normalize_weekdays(program["days"]),
+                    ),
+                )
+            )
+            for program in programs
+        )
+    )
+
+
+def _week_program(program: dict[str, Any]) -> WeekProgram:
+    """Return the read model of a validated program from a service call."""
+    return WeekProgram(
+        program["program"],
+        program["stage"],
+        program["start"].replace(second=0, microsecond=0),
+        program["stop"].replace(second=0, microsecond=0),
+        frozenset(int(day) for day in _normalize_weekdays(program["days"])),
+    )
+
+
+@callback
+def _async_handle_get_week_schedule(
+    hass: HomeAssistant, call: ServiceCall
+) -> ServiceResponse:
+    return {
+        "results": {
+            entry_id: {
+                "host": entry_data[CONF_IP_ADDRESS],
+                "programs": [
+                    program.as_dict()
+                    for _, program in sorted(
+                        entry_data[DATA_COORDINATOR].week_schedule.items()
+                    )
+                ],
+            }
+            for entry_id, entry_data in _async_get_target_entries(hass, call).items()
+        }
+    }
+
+
+@callback
+def _async_handle_get_history(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    resolutions = call.data.get("resolution")
+    fields = call.data.get("fields")
+    return {
+        "results": {
+            entry_id: {
+                "host": entry_data[CONF_IP_ADDRESS],
+                "history": entry_data[DATA_COORDINATOR].history.as_dict(
+                    resolutions, fields
+                ),
+            }
+            for entry_id, entry_data in _async_get_target_entries(hass, call).items()
+        }
+    }
+
+
+@callback
+def _async_handle_get_fan_telemetry(
+    hass: HomeAssistant, call: ServiceCall
+) -> ServiceResponse:
+    since = time.time() - call.data["hours"] * 3600
+    return {
+        "results": {
+            entry_id: {
+                "host": entry_data[CONF_IP_ADDRESS],
+                "telemetry": entry_data[DATA_COORDINATOR].telemetry.as_dict(
+                    since, call.data["samples"]
+                ),
+            }
+            for entry_id, entry_data in _async_get_target_entries(hass, call).items()
+        }
+    }
+
+
+def _validate_week_programs(programs: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Reject schedules with duplicate slots or overlapping programs."""
+    seen: set[int] = set()
+    windows: dict[int, list[tuple[int, int, int]]] = {}
+    for program in programs:
+        if program["program"] in seen:
+            raise vol.Invalid(f"Program {program['program']} is defined twice")
+        seen.add(program["program"])
+        for listed in dict.fromkeys(_normalize_weekdays(program["days"])):
+            for day, start, stop in _minute_ranges(
+                int(listed), program["start"], program["stop"]
+            ):
+                for other, other_start, other_stop in windows.get(day, ()):
+                    if start < other_stop and other_start < stop:
+                        raise vol.Invalid(
+                            f"Programs {other} and {program['program']} overlap"
+                        )
+                windows.setdefault(day, []).append((program["program"], start, stop))
+    return programs
+
+
+def _minute_ranges(
+    day: int, start: dt_time, stop: dt_time
+) -> list[tuple[int, int, int]]:
+    """Return the days and minutes a program covers, split at midnight.
+
+    The part after midnight belongs to the next day; Sunday wraps to Monday.
+    """
+    begin = start.hour * 60 + start.minute
+    end = stop.hour * 60 + stop.minute
+    if begin <= end:
+        return [(day, begin, end)]
+    return [(day, begin, 24 * 60), (day % 7 + 1, 0, end)]
+
+
+def _normalize_weekdays(raw_days: list[Any]) -> list[str]:
+    normalized: list[str] = []
+    for item in raw_days:
+        if isinstance(item, int):
+            normalized.append(str(item))
+            continue
+        normalized.append(WEEKDAY_VALUE[item.lower()])
+    return normalized
+
+
+def _build_week_program_payload(
+    program: int, stage: int, start: dt_time, stop: dt_time, day_values: list[str]
+) -> FormData:
+    p_value = 0 if program == 10 else program
+    start_hour = f"{start.hour:02d}"
+    start_minute = f"{start.minute:02d}"
+    stop_hour = f"{stop.hour:02d}"
+    stop_minute = f"{stop.minute:02d}"
+
+    selections = ["0"] * 7
+    for day in day_values:
+        idx = int(day) - 1
+        if idx < 0 or idx > 6:
+            continue
+        selections[idx] = day
+
+    form = FormData()
+    form.add_field(
+        "progsubmit",
+        f"P{p_value}S{stage}AH{start_hour}AM{start_minute}EH{stop_hour}EM{stop_minute}W{''.join(selections)}",
+    )
+    form.add_field("prog", str(program))
+    form.add_field("progstu", str(stage))
+    form.add_field("progstartH", start_hour)
+    form.add_field("progstartM", start_minute)
+    form.add_field("progstopH", stop_hour)
+    form.add_field("progstopM", stop_minute)
+    for day in day_values:
+        form.add_field("wota", day)
+    return form
+
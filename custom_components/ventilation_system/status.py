@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import copy
+from typing import Any, Callable, Iterable, Mapping
+
+from .clock import CLOCK_FIELDS
+from .fields import CONVERTERS
+from .metrics import (
+    ROLLING_FIELDS,
+    air_volume_balance,
+    bypass_effectiveness,
+    heat_recovery_efficiency,
+    heat_recovery_gain,
+)
+
+# Snapshot attribute -> (status.xml tag, converter), compiled from FIELD_SPECS
+FIELDS = CONVERTERS
+
+# Snapshot attribute -> value computed from the decoded fields
+DERIVED: dict[str, Callable[[VentilationStatus], Any]] = {
+    "heat_recovery_efficiency": lambda status: heat_recovery_efficiency(
+        status.aul0, status.zul0, status.abl0
+    ),
+    "heat_recovery_gain": lambda status: heat_recovery_gain(status.aul0, status.zul0),
+    "bypass_effectiveness": lambda status: bypass_effectiveness(
+        status.aul0, status.zul0, status.abl0, status.bypass
+    ),
+    "air_volume_balance": lambda status: air_volume_balance(
+        status.MoStZlVo, status.MoStAlVo
+    ),
+}
+
+# Decoded fields each derived value is computed from
+DERIVED_INPUTS: dict[str, tuple[str, ...]] = {
+    "heat_recovery_efficiency": ("aul0", "zul0", "abl0"),
+    "heat_recovery_gain": ("aul0", "zul0"),
+    "bypass_effectiveness": ("aul0", "zul0", "abl0", "bypass"),
+    "air_volume_balance": ("MoStZlVo", "MoStAlVo"),
+}
+
+# Rolling and clock values are filled in by the coordinator.
+ATTRIBUTES = (*FIELDS, *DERIVED, *ROLLING_FIELDS, *CLOCK_FIELDS)
+
+
+def required_tags(attrs: Iterable[str]) -> frozenset[str]:
+    """Return the status.xml tags needed to decode some snapshot attributes."""
+    tags = set()
+    for attr in attrs:
+        for field in DERIVED_INPUTS.get(attr, (attr,)):
+            if field in FIELDS:
+                tags.add(FIELDS[field][0])
+    return frozenset(tags)
+
+
+class VentilationStatus:
+    """Typed values decoded once per refresh from a status.xml payload."""
+
+    __slots__ = ("raw", *ATTRIBUTES)
+
+    def __init__(self, raw: Mapping[str, str]) -> None:
+        self.raw = raw
+        for attr, (tag, convert) in FIELDS.items():
+            setattr(self, attr, convert(raw.get(tag)))
+        for attr in (*ROLLING_FIELDS, *CLOCK_FIELDS):
+            setattr(self, attr, None)
+        self._derive()
+
+    def _derive(self) -> None:
+        for attr, compute in DERIVED.items():
+            setattr(self, attr, compute(self))
+
+    def get(self, attr: str) -> Any:
+        """Return a decoded field by name."""
+        return getattr(self, attr, None)
+
+    def replace(self, **changes: Any) -> VentilationStatus:
+        """Return a copy with some decoded fields replaced."""
+        status = copy.copy(self)
+        for attr, value in changes.items():
+            setattr(status, attr, value)
+        status._derive()
+        return status
+
+    def changed_fields(self, previous: VentilationStatus | None) -> set[str]:
+        """Return the fields whose value differs from a previous snapshot."""
+        if previous is None:
+            return set(ATTRIBUTES)
+        return {
+            attr for attr in ATTRIBUTES if getattr(self, attr) != getattr(previous, attr)
+        }
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, VentilationStatus):
+            return NotImplemented
+        return not self.changed_fields(other)
@@ -0,0 +1,209 @@
+"""High-frequency fan telemetry kept in compact delta-encoded series.
+
+``MoStZlUm``/``MoStAlUm`` are the supply and exhaust fan speeds in rpm,
+``MoStZlVo``/``MoStAlVo`` the air volumes they deliver in percent of the
+nominal flow. A constant-volume fan has to spin faster as its filter clogs,
+so a rising rpm per volume percent hints at a clogged filter.
+"""
+from __future__ import annotations
+
+from array import array
+from collections import deque
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timezone
+import math
+from typing import Any
+
+from .status import VentilationStatus
+
+TELEMETRY_FIELDS = ("MoStZlUm", "MoStAlUm", "MoStZlVo", "MoStAlVo")
+# Side -> (speed field, volume field)
+FANS = {"supply": ("MoStZlUm", "MoStZlVo"), "exhaust": ("MoStAlUm", "MoStAlVo")}
+
+# 48 blocks of 256 samples: 17 h at the 5 s minimum interval, 4 days at 30 s.
+BLOCK_SIZE = 256
+MAX_BLOCKS = 48
+# Mean supply/exhaust volume difference, in percentage points, that counts as
+# an imbalance.
+IMBALANCE_THRESHOLD = 10.0
+# Rise of the rpm per volume percent, in percent per day, that hints at a
+# clogging filter, and the span needed before a trend is reported.
+CLOGGING_THRESHOLD = 0.5
+MIN_TREND_SPAN = 6 * 3600
+
+
+class _Block:
+    """Samples stored as deltas to their predecessor, from an absolute start."""
+
+    __slots__ = ("start", "base", "times", "values")
+
+    def __init__(self, start: int, base: int) -> None:
+        self.start = start
+        self.base = base
+        self.times = array("H")
+        self.values = array("h")
+
+    def __len__(self) -> int:
+        return len(self.times) + 1
+
+
+class DeltaSeries:
+    """Integer samples taking four bytes each.
+
+    A sample is appended to the newest block as the seconds and value change
+    since the previous sample. A gap or jump too large for that starts a new
+    block, as does a full one; the oldest block is dropped as a whole.
+    """
+
+    __slots__ = ("_blocks", "_block_size", "_last")
+
+    def __init__(
+        self, block_size: int = BLOCK_SIZE, max_blocks: int = MAX_BLOCKS
+    ) -> None:
+        self._blocks: deque[_Block] = deque(maxlen=max_blocks)
+        self._block_size = block_size
+        self._last = (0, 0)
+
+    def __len__(self) -> int:
+        return sum(map(len, self._blocks))
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            block.times.itemsize * len(block.times)
+            + block.values.itemsize * len(block.values)
+            for block in self._blocks
+        )
+
+    def append(self, timestamp: int, value: int) -> None:
+        last_timestamp, last_value = self._last
+        step = timestamp - last_timestamp
+        change = value - last_value
+        if (
+            self._blocks
+            and len(self._blocks[-1]) < self._block_size
+            and 0 <= step <= 0xFFFF
+            and -0x8000 <= change <= 0x7FFF
+        ):
+            block = self._blocks[-1]
+            block.times.append(step)
+            block.values.append(change)
+        else:
+            self._blocks.append(_Block(timestamp, value))
+        self._last = (timestamp, value)
+
+    def samples(self, since: float = 0) -> Iterator[tuple[int, int]]:
+        """Yield ``(timestamp, value)`` pairs from ``since`` on, oldest first."""
+        blocks = list(self._blocks)
+        for index, block in enumerate(blocks):
+            if index + 1 < len(blocks) and blocks[index + 1].start <= since:
+                continue
+            timestamp, value = block.start, block.base
+            if timestamp >= since:
+                yield timestamp, value
+            for step, change in zip(block.times, block.values):
+                timestamp += step
+                value += change
+                if timestamp >= since:
+                    yield timestamp, value
+
+
+def _slope(xs: list[float], ys: list[float]) -> float | None:
+    """Return the least squares slope of ``ys`` over ``xs``."""
+    count = len(xs)
+    if count < 2:
+        return None
+    mean_x = math.fsum(xs) / count
+    mean_y = math.fsum(ys) / count
+    variance = math.sumprod(xs, xs) - count * mean_x * mean_x
+    if variance <= 0:
+        return None
+    return (math.sumprod(xs, ys) - count * mean_x * mean_y) / variance
+
+
+class FanTelemetry:
+    """Delta-encoded series of the fan values of one controller."""
+
+    def __init__(self, fields: Iterable[str] = TELEMETRY_FIELDS) -> None:
+        self._series = {field: DeltaSeries() for field in fields}
+
+    def add(self, timestamp: float, status: VentilationStatus) -> None:
+        for field, series in self._series.items():
+            if (value := status.get(field)) is not None:
+                series.append(int(timestamp), value)
+
+    def series(self, field: str) -> DeltaSeries:
+        return self._series[field]
+
+    def _paired(
+        self, first: str, second: str, since: float
+    ) -> list[tuple[int, int, int]]:
+        """Return ``(timestamp, first, second)`` for samples of the same poll."""
+        seconds = dict(self._series[second].samples(since))
+        return [
+            (timestamp, value, seconds[timestamp])
+            for timestamp, value in self._series[first].samples(since)
+            if timestamp in seconds
+        ]
+
+    def imbalance(self, since: float = 0) -> dict[str, Any]:
+        """Compare the supply and exhaust volumes over a window."""
+        pairs = self._paired("MoStZlVo", "MoStAlVo", since)
+        if not pairs:
+            return {"samples": 0, "mean": None, "imbalanced": None}
+        mean = math.fsum(supply - exhaust for _, supply, exhaust in pairs)
+        mean /= len(pairs)
+        return {
+            "samples": len(pairs),
+            "mean": round(mean, 1),
+            "imbalanced": abs(mean) >= IMBALANCE_THRESHOLD,
+        }
+
+    def filter_trend(self, side: str, since: float = 0) -> dict[str, Any]:
+        """Trend the rpm a fan needs per volume percent over a window."""
+        speed, volume = FANS[side]
+        pairs = [
+            (timestamp, rpm / percent)
+            for timestamp, rpm, percent in self._paired(speed, volume, since)
+            if percent > 0
+        ]
+        if not pairs:
+            return {
+                "samples": 0,
+                "rpm_per_percent": None,
+                "trend": None,
+                "clogging": None,
+            }
+        times = [float(timestamp - pairs[0][0]) for timestamp, _ in pairs]
+        ratios = [ratio for _, ratio in pairs]
+        mean = math.fsum(ratios) / len(ratios)
+        slope = _slope(times, ratios) if times[-1] >= MIN_TREND_SPAN else None
+        trend = None if slope is None else slope * 86400 / mean * 100
+        return {
+            "samples": len(pairs),
+            "rpm_per_percent": round(mean, 2),
+            # Percent per day
+            "trend": None if trend is None else round(trend, 2),
+            "clogging": None if trend is None else trend >= CLOGGING_THRESHOLD,
+        }
+
+    def as_dict(
+        self, since: float = 0, include_samples: bool = False
+    ) -> dict[str, Any]:
+        """Return the trend analysis, and optionally the raw samples."""
+        result: dict[str, Any] = {
+            "imbalance": self.imbalance(since),
+            "filters": {side: self.filter_trend(side, since) for side in FANS},
+        }
+        if include_samples:
+            result["samples"] = {
+                field: [
+                    [
+                        datetime.fromtimestamp(timestamp, timezone.utc).isoformat(),
+                        value,
+                    ]
+                    for timestamp, value in series.samples(since)
+                ]
+                for field, series in self._series.items()
+            }
+        return result
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from contextlib import AbstractContextManager, nullcontext
+import time
+from types import SimpleNamespace
+from typing import Any
+
+import aiohttp
+
+# connect, first_byte and body come from the HTTP client, the rest from the
+# coordinator and the command queue.
+STAGES = ("connect", "first_byte", "body", "parse", "dispatch", "command")
+
+# Upper bucket bounds in milliseconds; one more bucket catches slower samples.
+BUCKET_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+_DISABLED: AbstractContextManager[None] = nullcontext()
+
+
+class TimingHistogram:
+    """Fixed-bucket latency histogram."""
+
+    __slots__ = ("counts", "count", "total", "last", "maximum")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.last: float | None = None
+        self.maximum = 0.0
+
+    def record(self, seconds: float) -> None:
+        milliseconds = seconds * 1000
+        self.counts[bisect_left(BUCKET_BOUNDS_MS, milliseconds)] += 1
+        self.count += 1
+        self.total += milliseconds
+        self.last = milliseconds
+        if milliseconds > self.maximum:
+            self.maximum = milliseconds
+
+    def percentile(self, fraction: float) -> float | None:
+        """Return the upper bound of the bucket holding the percentile, in ms."""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(BUCKET_BOUNDS_MS, self.counts):
+            seen += count
+            if seen >= rank:
+                return float(min(bound, self.maximum))
+        return self.maximum
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 2) if self.count else None,
+            "last_ms": round(self.last, 2) if self.last is not None else None,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "max_ms": round(self.maximum, 2),
+            "buckets": {
+                **{
+                    f"le_{bound}": count
+                    for bound, count in zip(BUCKET_BOUNDS_MS, self.counts)
+                },
+                "inf": self.counts[-1],
+            },
+        }
+
+
+class _Measurement:
+    __slots__ = ("_histogram", "_start")
+
+    def __init__(self, histogram: TimingHistogram) -> None:
+        self._histogram = histogram
+        self._start = 0.0
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._histogram.record(time.perf_counter() - self._start)
+
+
+class TimingRecorder:
+    """Collect per-stage latency histograms for one controller.
+
+    A disabled recorder hands out a shared no-op context manager and
+    installs no HTTP trace hooks, so instrumented code paths cost one
+    attribute check.
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self.histograms: dict[str, TimingHistogram] = (
+            {stage: TimingHistogram() for stage in STAGES} if enabled else {}
+        )
+
+    def measure(self, stage: str) -> AbstractContextManager[None]:
+        if not self.enabled:
+            return _DISABLED
+        return _Measurement(self.histograms[stage])
+
+    def record(self, stage: str, seconds: float) -> None:
+        if self.enabled:
+            self.histograms[stage].record(seconds)
+
+    def trace_configs(self) -> list[aiohttp.TraceConfig]:
+        """Return aiohttp hooks timing connection setup and time to first byte."""
+        if not self.enabled:
+            return []
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_connection_create_start.append(self._on_connect_start)
+        trace_config.on_connection_create_end.append(self._on_connect_end)
+        trace_config.on_request_end.append(self._on_request_end)
+        return [trace_config]
+
+    async def _on_request_start(
+        self, session: aiohttp.ClientSession, context: SimpleNamespace, params: Any
+    ) -> None:
+        context.request_start = time.perf_counter()
+
+    async def _on_connect_start(
+        self, session: aiohttp.ClientSession, context: SimpleNamespace, params: Any
+    ) -> None:
+        context.connect_start = time.perf_counter()
+
+    async def _on_connect_end(
+        self, session: aiohttp.ClientSession, context: SimpleNamespace, params: Any
+    ) -> None:
+        self.record("connect", time.perf_counter() - context.connect_start)
+
+    async def _on_request_end(
+        self, session: aiohttp.ClientSession, context: SimpleNamespace, params: Any
+    ) -> None:
+        # Sent once the response headers were read.
+        self.record("first_byte", time.perf_counter() - context.request_start)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "stages": {
+                stage: histogram.as_dict()
+                for stage, histogram in self.histograms.items()
+            },
+        }
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Mapping
+from contextlib import asynccontextmanager
+
+import aiohttp
+import async_timeout
+from aiohttp import FormData
+from homeassistant.exceptions import HomeAssistantError
+
+from .breaker import CircuitBreaker, CircuitOpenError
+from .timing import TimingRecorder
+
+REQUEST_TIMEOUT = 15
+# The controller webserver only serves one connection at a time.
+CONNECTION_LIMIT = 1
+KEEPALIVE_TIMEOUT = 10
+DNS_CACHE_TTL = 300
+
+
+class VentilationTransport:
+    """HTTP client bound to a single ventilation controller.
+
+    All requests to the controller share one keep-alive connection, so
+    polls and commands are serialized on the wire instead of racing for
+    the device's single connection slot.
+    """
+
+    def __init__(self, host: str, timing: TimingRecorder | None = None) -> None:
+        self.host = host
+        self.timing = timing or TimingRecorder()
+        self.breaker = CircuitBreaker(host)
+        self._session: aiohttp.ClientSession | None = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=CONNECTION_LIMIT,
+                limit_per_host=CONNECTION_LIMIT,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+                use_dns_cache=True,
+                ttl_dns_cache=DNS_CACHE_TTL,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector, trace_configs=self.timing.trace_configs()
+            )
+        return self._session
+
+    def url(self, path: str) -> str:
+        return f"http://{self.host}{path}"
+
+    async def async_get(
+        self,
+        path: str,
+        headers: Mapping[str, str] | None = None,
+        timeout: float = REQUEST_TIMEOUT,
+    ) -> tuple[aiohttp.ClientResponse, bytes]:
+        """GET a document and return the released response with its body.
+
+        Raises ``asyncio.TimeoutError``, ``aiohttp.ClientError`` or
+        ``CircuitOpenError``.
+        """
+        async with self._guard(timeout) as timeout:
+            async with async_timeout.timeout(timeout):
+                async with self.session.get(
+                    self.url(path), headers=headers
+                ) as response:
+                    response.raise_for_status()
+                    with self.timing.measure("body"):
+                        body = await response.read()
+                    return response, body
+
+    async def async_request(
+        self, method: str, path: str, data: FormData | None = None
+    ) -> None:
+        """Send a command to the controller."""
+        url = self.url(path)
+        try:
+            async with self._guard(REQUEST_TIMEOUT) as timeout:
+                async with async_timeout.timeout(timeout):
+                    async with self.session.request(
+                        method, url, data=data
+                    ) as response:
+                        response.raise_for_status()
+                        await response.read()
+        except CircuitOpenError as err:
+            raise HomeAssistantError(str(err)) from err
+        except asyncio.TimeoutError as err:
+            raise HomeAssistantError(f"Timeout while contacting {url}") from err
+        except aiohttp.ClientResponseError as err:
+            raise HomeAssistantError(f"Request to {url} failed: {err.status}") from err
+        except aiohttp.ClientError as err:
+            raise HomeAssistantError(f"Could not call {url}: {err}") from err
+
+    @asynccontextmanager
+    async def _guard(self, timeout: float) -> AsyncIterator[float]:
+        """Run a request through the circuit breaker.
+
+        Only timeouts and connection errors count as failures; an HTTP error
+        status still proves the controller is reachable.
+        """
+        timeout = self.breaker.before_request(timeout)
+        try:
+            yield timeout
+        except (asyncio.TimeoutError, aiohttp.ClientConnectionError):
+            self.breaker.record_failure()
+            raise
+        except aiohttp.ClientResponseError:
+            self.breaker.record_success()
+            raise
+        except BaseException:
+            self.breaker.release()
+            raise
+        else:
+            self.breaker.record_success()
+
+    async def async_close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
@@ -0,0 +1,218 @@
+"""Local stand-in for profi-air controllers.
+
+One aiohttp application simulates any number of controllers. Controller
+``n`` answers below ``/<n>/`` so a ``VentilationTransport`` pointed at
+``127.0.0.1:<port>/<n>`` talks to it unchanged; ``/status.xml`` and the
+other pages at the root belong to controller 0.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+import datetime as dt
+from pathlib import Path
+import random
+import re
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.ventilation_system.timing import TimingRecorder
+
+FIXTURE = Path(__file__).parent / "fixtures" / "status.xml"
+
+TAG_RE = re.compile(r"<(\w+)>(.*)</\1>")
+PROGRAM_RE = re.compile(
+    r"P(\d)S(\d)AH(\d\d)AM(\d\d)EH(\d\d)EM(\d\d)W([0-7]{7})"
+)
+BYPASS_TEXT = {"bypa0": "Hand: Auf", "bypa1": "Hand: Zu", "bypa2": "Auto: Zu"}
+WEEKDAYS = ("Mo", "Di", "Mi", "Do", "Fr", "Sa", "So")
+TEMPERATURES = ("abl0", "zul0", "aul0", "fol0")
+
+
+@dataclass
+class Behavior:
+    """How a simulated controller misbehaves."""
+
+    # Uniform delay before the response starts, in seconds.
+    latency: tuple[float, float] = (0.0, 0.0)
+    # Delay between body chunks; non-zero streams status.xml in pieces.
+    chunk_delay: float = 0.0
+    chunks: int = 4
+    # Fraction of status requests answered with HTTP 500.
+    error_rate: float = 0.0
+    # Chance per status request that one temperature moves by 0.1 K.
+    drift: float = 0.0
+
+
+class SimulatedController:
+    """State and request counters of one simulated controller."""
+
+    def __init__(self, behavior: Behavior, seed: int = 0) -> None:
+        self.behavior = behavior
+        self.values: dict[str, str] = dict(
+            TAG_RE.findall(FIXTURE.read_text(encoding="utf-8"))
+        )
+        self.requests: Counter[str] = Counter()
+        self.commands: list[str] = []
+        self._rng = random.Random(seed)
+
+    def render(self) -> bytes:
+        now = dt.datetime.now()
+        self.values["time"] = now.strftime("%H:%M:%S")
+        body = "".join(f"<{tag}>{value}</{tag}>\n" for tag, value in self.values.items())
+        return f"<response>\n{body}</response>\n".encode()
+
+    async def delay(self) -> None:
+        low, high = self.behavior.latency
+        if high:
+            await asyncio.sleep(self._rng.uniform(low, high))
+
+    def fails(self) -> bool:
+        return self._rng.random() < self.behavior.error_rate
+
+    def drift(self) -> None:
+        if self._rng.random() < self.behavior.drift:
+            tag = self._rng.choice(TEMPERATURES)
+            value = float(self.values[tag]) + self._rng.choice((-0.1, 0.1))
+            self.values[tag] = f" {value:04.1f}"
+
+    def set_stage(self, stage: int) -> None:
+        self.commands.append(f"stage={stage}")
+        self.values["aktuell0"] = f"Stufe{stage}"
+
+    def set_bypass(self, mode: str) -> None:
+        self.commands.append(f"bypass={mode}")
+        self.values["bypass"] = BYPASS_TEXT[mode]
+
+    def set_week_program(self, submit: str) -> None:
+        match = PROGRAM_RE.fullmatch(submit)
+        if match is None:
+            raise ValueError(submit)
+        program, stage, start_h, start_m, stop_h, stop_m, days = match.groups()
+        slot = int(program) or 10
+        self.commands.append(f"program{slot}={submit}")
+        self.values[f"prg{slot}"] = f"Stufe {stage}  "
+        self.values[f"prg_start{slot}"] = f"{start_h}:{start_m}"
+        self.values[f"prg_stop{slot}"] = f"{stop_h}:{stop_m}"
+        self.values[f"prg_wota{slot}"] = (
+            ",".join(name for name, day in zip(WEEKDAYS, days) if day != "0") or "-"
+        )
+
+
+class ControllerFarm:
+    """Serve a number of simulated controllers from one local server."""
+
+    def __init__(
+        self, count: int = 1, behavior: Behavior | None = None, seed: int = 0
+    ) -> None:
+        self.controllers = [
+            SimulatedController(behavior or Behavior(), seed + unit)
+            for unit in range(count)
+        ]
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.app = web.Application()
+        for prefix in ("", "/{unit}"):
+            self.app.router.add_get(f"{prefix}/status.xml", self._status)
+            self.app.router.add_get(f"{prefix}/stufe.cgi", self._stage)
+            self.app.router.add_post(f"{prefix}/setup.htm", self._setup)
+            self.app.router.add_post(f"{prefix}/wopla.htm", self._week_program)
+
+    def controller(self, request: web.Request) -> SimulatedController:
+        try:
+            return self.controllers[int(request.match_info.get("unit", 0))]
+        except (IndexError, ValueError) as err:
+            raise web.HTTPNotFound from err
+
+    @asynccontextmanager
+    async def serve(self) -> AsyncIterator[TestServer]:
+        async with TestServer(self.app) as server:
+            yield server
+
+    @staticmethod
+    def host(server: TestServer, unit: int) -> str:
+        """Return the host string a transport uses to reach one controller."""
+        return f"{server.host}:{server.port}/{unit}"
+
+    async def _status(self, request: web.Request) -> web.StreamResponse:
+        controller = self.controller(request)
+        controller.requests["status"] += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await controller.delay()
+            if controller.fails():
+                raise web.HTTPInternalServerError
+            controller.drift()
+            payload = controller.render()
+            if not controller.behavior.chunk_delay:
+                return web.Response(body=payload, content_type="text/xml")
+            response = web.StreamResponse(headers={"Content-Type": "text/xml"})
+            response.content_length = len(payload)
+            await response.prepare(request)
+            size = -(-len(payload) // controller.behavior.chunks)
+            for start in range(0, len(payload), size):
+                await asyncio.sleep(controller.behavior.chunk_delay)
+                await response.write(payload[start : start + size])
+            await response.write_eof()
+            return response
+        finally:
+            self.in_flight -= 1
+
+    async def _stage(self, request: web.Request) -> web.Response:
+        controller = self.controller(request)
+        controller.requests["stufe.cgi"] += 1
+        await controller.delay()
+        controller.set_stage(int(request.query["stufe"]))
+        return web.Response(text="OK")
+
+    async def _setup(self, request: web.Request) -> web.Response:
+        controller = self.controller(request)
+        controller.requests["setup.htm"] += 1
+        form = await request.post()
+        await controller.delay()
+        controller.set_bypass(str(form["bypassSt"]))
+        return web.Response(text="<html></html>", content_type="text/html")
+
+    async def _week_program(self, request: web.Request) -> web.Response:
+        controller = self.controller(request)
+        controller.requests["wopla.htm"] += 1
+        form = await request.post()
+        await controller.delay()
+        try:
+            controller.set_week_program(str(form["progsubmit"]))
+        except ValueError as err:
+            raise web.HTTPBadRequest from err
+        return web.Response(text="<html></html>", content_type="text/html")
+
+
+class RecordingTransport:
+    """Transport that records command paths instead of sending them."""
+
+    host = "controller"
+    timing = TimingRecorder()
+
+    def __init__(self, fail_paths: set[str] | None = None) -> None:
+        self.sent: list[str] = []
+        self.fail_paths = fail_paths or set()
+
+    async def async_request(self, method: str, path: str, data=None) -> None:
+        await asyncio.sleep(0.01)
+        if path in self.fail_paths:
+            raise HomeAssistantError(f"Request to {path} failed: 500")
+        self.sent.append(path)
+
+
+class LoopOnlyHass:
+    """The part of HomeAssistant the command queue uses."""
+
+    def __init__(self) -> None:
+        self.loop = asyncio.get_running_loop()
+
+    def async_create_background_task(self, target, name):
+        return self.loop.create_task(target, name=name)
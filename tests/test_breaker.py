@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import pytest
+
+from custom_components.ventilation_system.breaker import (
+    PROBE_TIMEOUT,
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _tripped(clock: FakeClock) -> CircuitBreaker:
+    breaker = CircuitBreaker("host", threshold=3, reset_timeout=30, clock=clock)
+    for _ in range(3):
+        breaker.before_request(15)
+        breaker.record_failure()
+    return breaker
+
+
+def test_breaker_opens_after_consecutive_failures() -> None:
+    clock = FakeClock()
+    breaker = CircuitBreaker("host", threshold=3, reset_timeout=30, clock=clock)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+
+    assert breaker.state is CircuitState.CLOSED
+    breaker.record_failure()
+    assert breaker.state is CircuitState.OPEN
+    assert breaker.trips == 1
+
+    clock.now = 10
+    with pytest.raises(CircuitOpenError) as err:
+        breaker.before_request(15)
+    assert err.value.retry_in == 20
+
+
+def test_breaker_probes_once_with_short_timeout() -> None:
+    clock = FakeClock()
+    breaker = _tripped(clock)
+    clock.now = 30
+
+    assert breaker.state is CircuitState.HALF_OPEN
+    assert breaker.before_request(15) == PROBE_TIMEOUT
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request(15)
+
+    breaker.record_success()
+    assert breaker.state is CircuitState.CLOSED
+    assert breaker.before_request(15) == 15
+
+
+def test_failed_probe_backs_off() -> None:
+    clock = FakeClock()
+    breaker = _tripped(clock)
+    clock.now = 30
+    breaker.before_request(15)
+    breaker.record_failure()
+
+    clock.now = 89
+    assert breaker.state is CircuitState.OPEN
+    clock.now = 90
+    assert breaker.state is CircuitState.HALF_OPEN
+    assert breaker.as_dict()["reset_timeout"] == 60
+    assert breaker.trips == 1
+
+
+def test_released_probe_can_be_retried() -> None:
+    clock = FakeClock()
+    breaker = _tripped(clock)
+    clock.now = 30
+    breaker.before_request(15)
+    breaker.release()
+
+    assert breaker.before_request(15) == PROBE_TIMEOUT
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from custom_components.ventilation_system.clock import (
+    TICK_MARGIN,
+    DeviceClock,
+    device_timestamp,
+)
+
+from tests.simulator import FIXTURE
+
+START = datetime(2025, 11, 26, 13, 13, 41, tzinfo=timezone.utc)
+
+
+def stamped(moment: datetime) -> bytes:
+    return (
+        f"<response><time>{moment:%H:%M:%S}</time>"
+        f"<date>Mi, {moment:%d.%m.%Y}</date></response>"
+    ).encode()
+
+
+def test_device_timestamp_is_read_from_payload() -> None:
+    assert device_timestamp(FIXTURE.read_bytes(), timezone.utc) == START.timestamp()
+    cet = timezone(timedelta(hours=1))
+    assert device_timestamp(FIXTURE.read_bytes(), cet) == START.timestamp() - 3600
+    assert device_timestamp(b"<response></response>", timezone.utc) is None
+
+
+def test_repeated_stamp_marks_a_repeat() -> None:
+    clock = DeviceClock(timezone.utc)
+    base = START.timestamp()
+
+    assert clock.observe(stamped(START), base)
+    # Polled within the same second: an equal stamp is expected.
+    assert clock.observe(stamped(START), base + 0.5)
+    assert not clock.observe(stamped(START), base + 30)
+    assert not clock.observe(stamped(START), base + 60)
+    assert clock.repeats == 2
+    assert clock.stalled_for(base + 90) == 60
+    assert clock.observe(stamped(START + timedelta(seconds=90)), base + 90)
+    assert clock.stalled_for(base + 90) is None
+
+
+def test_drift_and_refresh_tick_are_learnt() -> None:
+    clock = DeviceClock(timezone.utc)
+    base = START.timestamp()
+    # The controller runs 42 s ahead and refreshes its document every 10 s.
+    for poll in range(12):
+        received = base + poll * 13
+        refreshed = received - (received - base) % 10
+        device_time = START + timedelta(seconds=refreshed - base + 42)
+        clock.observe(stamped(device_time), received)
+
+    assert clock.drift == 42
+    assert clock.tick == 10
+    # The last refresh was at base + 140; the next one is at base + 150.
+    assert clock.delay_to_tick(base + 145) == 5 + TICK_MARGIN
+
+
+def test_clock_set_back_resets_estimates() -> None:
+    clock = DeviceClock(timezone.utc)
+    base = START.timestamp()
+    clock.observe(stamped(START), base)
+    clock.observe(stamped(START - timedelta(hours=1)), base + 30)
+
+    assert clock.timestamp == base - 3600
+    assert clock.drift == -3630
+    assert clock.tick is None
+    assert clock.delay_to_tick(base) == 0.0
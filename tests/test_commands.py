@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.ventilation_system.commands import (
+    VentilationCommand,
+    VentilationCommandQueue,
+)
+
+from tests.simulator import LoopOnlyHass, RecordingTransport
+
+
+def stage(value: int) -> VentilationCommand:
+    return VentilationCommand("stage", "GET", f"/stufe.cgi?stufe={value}")
+
+
+def test_superseded_stage_commands_are_coalesced() -> None:
+    async def run() -> tuple[list[str], int, VentilationCommandQueue]:
+        transport = RecordingTransport()
+        drains = 0
+
+        async def on_drained() -> None:
+            nonlocal drains
+            drains += 1
+
+        queue = VentilationCommandQueue(LoopOnlyHass(), transport, on_drained)
+        first = asyncio.ensure_future(queue.async_submit(stage(1)))
+        await asyncio.sleep(0)
+        await asyncio.gather(
+            first,
+            queue.async_submit(stage(2)),
+            queue.async_submit(VentilationCommand("bypass", "POST", "/setup.htm")),
+            queue.async_submit(stage(3)),
+        )
+        await asyncio.sleep(0.01)
+        return transport.sent, drains, queue
+
+    sent, drains, queue = asyncio.run(run())
+
+    assert sent == ["/stufe.cgi?stufe=1", "/setup.htm", "/stufe.cgi?stufe=3"]
+    assert drains == 1
+    assert (queue.sent, queue.coalesced) == (3, 1)
+    assert queue.refresher.executed == 1
+
+
+def test_refreshes_inside_settle_window_are_merged() -> None:
+    async def run() -> tuple[list[str], int, VentilationCommandQueue]:
+        transport = RecordingTransport()
+        drains = 0
+
+        async def on_drained() -> None:
+            nonlocal drains
+            drains += 1
+
+        queue = VentilationCommandQueue(
+            LoopOnlyHass(), transport, on_drained, settle=0.05
+        )
+        # A script sending commands one after another drains the queue each time.
+        await queue.async_submit(stage(1))
+        await asyncio.sleep(0.02)
+        await queue.async_submit(VentilationCommand("bypass", "POST", "/setup.htm"))
+        await asyncio.sleep(0.02)
+        await queue.async_submit(stage(2))
+        assert drains == 0
+        await asyncio.sleep(0.1)
+        return transport.sent, drains, queue
+
+    sent, drains, queue = asyncio.run(run())
+
+    assert len(sent) == 3
+    assert drains == 1
+    assert (queue.refresher.coalesced, queue.refresher.executed) == (2, 1)
+
+
+def test_failed_command_raises_for_its_callers() -> None:
+    async def run() -> None:
+        transport = RecordingTransport(fail_paths={"/setup.htm"})
+
+        async def on_drained() -> None:
+            return None
+
+        queue = VentilationCommandQueue(LoopOnlyHass(), transport, on_drained)
+        with pytest.raises(HomeAssistantError):
+            await queue.async_submit(VentilationCommand("bypass", "POST", "/setup.htm"))
+        await queue.async_submit(stage(2))
+        assert transport.sent == ["/stufe.cgi?stufe=2"]
+
+    asyncio.run(run())
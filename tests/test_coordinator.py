@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import asdict
+from functools import partial
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.ventilation_system.coordinator import (
+    VentilationDataCoordinator,
+    VentilationFleet,
+)
+from custom_components.ventilation_system.decoder import decode_status
+from custom_components.ventilation_system.transport import VentilationTransport
+
+from tests.simulator import FIXTURE, ControllerFarm
+
+FIELDS = ("aktuell0", "zul0")
+
+
+class MemoryStore:
+    def __init__(self, data: dict[str, Any] | None = None) -> None:
+        self.data = data
+
+    async def async_load(self) -> dict[str, Any] | None:
+        return self.data
+
+    def async_delay_save(self, data_func, delay: float) -> None:
+        self.data = data_func()
+
+
+def _coordinator(
+    hass: HomeAssistant, host: str, store: MemoryStore | None = None
+) -> VentilationDataCoordinator:
+    fleet = VentilationFleet()
+    fleet.register(host)
+    return VentilationDataCoordinator(
+        hass, VentilationTransport(host), fleet, store=store
+    )
+
+
+def test_unchanged_polls_are_dispatched_and_suppressed(tmp_path) -> None:
+    farm = ControllerFarm(1)
+
+    async def run() -> tuple[list[str], list[dict[str, Any]]]:
+        hass = HomeAssistant(str(tmp_path))
+        calls: list[str] = []
+        stats = []
+        async with farm.serve() as server:
+            coordinator = _coordinator(hass, ControllerFarm.host(server, 0))
+            removers = [
+                coordinator.async_add_listener(partial(calls.append, field), field)
+                for field in FIELDS
+            ]
+            for _ in range(3):
+                await coordinator.async_refresh()
+                stats.append(asdict(coordinator.dispatch_stats))
+            for remove in removers:
+                remove()
+            await coordinator.transport.async_close()
+        return calls, stats
+
+    calls, stats = asyncio.run(run())
+
+    assert calls == list(FIELDS)
+    assert stats[0] == {
+        "last_notified": 2,
+        "last_suppressed": 0,
+        "total_notified": 2,
+        "total_suppressed": 0,
+    }
+    # Polls that change nothing are still counted.
+    assert stats[2] == {
+        "last_notified": 0,
+        "last_suppressed": 2,
+        "total_notified": 2,
+        "total_suppressed": 4,
+    }
+
+
+def test_first_poll_after_restore_clears_stale_on_every_entity(tmp_path) -> None:
+    farm = ControllerFarm(1)
+    store = MemoryStore({"raw": decode_status(FIXTURE.read_bytes())})
+
+    async def run() -> tuple[bool, bool, list[str]]:
+        hass = HomeAssistant(str(tmp_path))
+        calls: list[str] = []
+        async with farm.serve() as server:
+            coordinator = _coordinator(hass, ControllerFarm.host(server, 0), store)
+            assert await coordinator.async_restore_snapshot()
+            restored_stale = coordinator.stale
+            removers = [
+                coordinator.async_add_listener(partial(calls.append, field), field)
+                for field in FIELDS
+            ]
+            # The controller reports what the snapshot already holds.
+            await coordinator.async_refresh()
+            for remove in removers:
+                remove()
+            await coordinator.transport.async_close()
+        return restored_stale, coordinator.stale, calls
+
+    restored_stale, stale, calls = asyncio.run(run())
+
+    assert restored_stale
+    assert not stale
+    assert calls == list(FIELDS)
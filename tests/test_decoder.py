@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+import xmltodict
+
+from custom_components.ventilation_system.coordinator import payload_digest
+from custom_components.ventilation_system.decoder import StatusDecoder, decode_status
+from custom_components.ventilation_system.status import (
+    VentilationStatus,
+    required_tags,
+)
+
+
+def load_payload() -> bytes:
+    return Path("tests/fixtures/status.xml").read_bytes()
+
+
+def test_decode_status_matches_xmltodict() -> None:
+    payload = load_payload()
+    expected = {
+        key: (value or "").strip()
+        for key, value in xmltodict.parse(payload)["response"].items()
+    }
+
+    assert decode_status(payload) == expected
+
+
+def test_decoder_accepts_arbitrary_chunks() -> None:
+    payload = load_payload()
+    decoder = StatusDecoder()
+    for offset in range(0, len(payload), 7):
+        decoder.feed(payload[offset : offset + 7])
+    values = decoder.close()
+
+    assert values["bypass"] == "Auto: Zu"
+    assert values["fs_para15"] == "+0.8"
+    assert values["aktuell0"] == "Stufe2 Abwesend"
+
+
+def test_decoder_projects_requested_tags() -> None:
+    payload = load_payload()
+    tags = required_tags(
+        ("aktuell0", "heat_recovery_efficiency", "filter_replacement_needed")
+    )
+    values = decode_status(payload, tags=tags)
+
+    assert tags == {"aktuell0", "aul0", "zul0", "abl0", "filter0"}
+    assert values == {tag: decode_status(payload)[tag] for tag in tags}
+    status = VentilationStatus(values)
+    assert status.aktuell0 == 2
+    assert status.heat_recovery_efficiency is not None
+    assert status.bypass is None
+
+
+def test_decoder_rejects_invalid_payloads() -> None:
+    with pytest.raises(ValueError):
+        decode_status(b"<response><abl0>20")
+    with pytest.raises(ValueError):
+        decode_status(b"<status><abl0>20</abl0></status>")
+
+
+def test_payload_digest_ignores_controller_clock() -> None:
+    payload = load_payload()
+    later = payload.replace(b"<time>13:13:41</time>", b"<time>13:14:11</time>")
+    changed = payload.replace(b"<abl0> 20.0</abl0>", b"<abl0> 20.1</abl0>")
+
+    assert payload_digest(later) == payload_digest(payload)
+    assert payload_digest(changed) != payload_digest(payload)
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+
+import aiohttp
+import pytest
+
+from custom_components.ventilation_system.discovery import (
+    DiscoveredController,
+    async_probe,
+    async_scan,
+    controller_mac,
+)
+
+from tests.simulator import FIXTURE, ControllerFarm
+
+
+def test_mac_is_read_and_normalised() -> None:
+    assert controller_mac(FIXTURE.read_bytes()) == "54:10:ec:8e:8d:05"
+    assert (
+        controller_mac(b"<config_mac> 54-10-EC-8E-8D-0A </config_mac>")
+        == "54:10:ec:8e:8d:0a"
+    )
+    assert controller_mac(b"<response></response>") is None
+
+
+def test_probe_identifies_each_controller_by_mac() -> None:
+    farm = ControllerFarm(3)
+    for unit, controller in enumerate(farm.controllers):
+        controller.values["config_mac"] = f"54:10:EC:8E:8D:0{unit}"
+
+    async def probe() -> list[DiscoveredController | None]:
+        async with farm.serve() as server, aiohttp.ClientSession() as session:
+            hosts = [farm.host(server, unit) for unit in range(4)]
+            return [await async_probe(session, host) for host in hosts]
+
+    found = asyncio.run(probe())
+
+    assert [controller.mac for controller in found[:3]] == [
+        "54:10:ec:8e:8d:00",
+        "54:10:ec:8e:8d:01",
+        "54:10:ec:8e:8d:02",
+    ]
+    # No controller behind that unit.
+    assert found[3] is None
+
+
+def test_scan_finds_the_controller_on_a_subnet() -> None:
+    farm = ControllerFarm(1)
+
+    async def scan() -> list[DiscoveredController]:
+        async with farm.serve() as server, aiohttp.ClientSession() as session:
+            return await async_scan(
+                session,
+                ipaddress.ip_network("127.0.0.0/29"),
+                port=server.port,
+                workers=2,
+                timeout=1,
+            )
+
+    found = asyncio.run(scan())
+
+    assert [controller.mac for controller in found] == ["54:10:ec:8e:8d:05"]
+    assert found[0].host.startswith("127.0.0.1:")
+
+
+def test_scan_rejects_large_subnets() -> None:
+    async def scan() -> None:
+        async with aiohttp.ClientSession() as session:
+            await async_scan(session, ipaddress.ip_network("10.0.0.0/16"))
+
+    with pytest.raises(ValueError):
+        asyncio.run(scan())
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from custom_components.ventilation_system.decoder import decode_status
+from custom_components.ventilation_system.fields import (
+    BYPASS_STATES,
+    CONVERTERS,
+    FIELD_SPECS,
+    FieldSpec,
+    FieldType,
+    compile_field,
+)
+
+def test_compiled_converters_decode_fixture() -> None:
+    raw = decode_status(Path("tests/fixtures/status.xml").read_bytes())
+    values = {}
+    for attr, spec in FIELD_SPECS.items():
+        tag, convert = CONVERTERS[attr]
+        assert tag == spec.tag
+        values[attr] = convert(raw.get(tag))
+
+    assert values["aktuell0"] == 2
+    assert values["control0"] == "manuelle Stufenwahl"
+    assert values["bypass"] == "auto_closed"
+    assert values["rest_time"] == 0
+    assert values["abl0"] == 20.0
+    assert values["MoStZlUm"] == 1813
+    assert values["DiIn3"] is True
+    assert values["filter_replacement_needed"] is True
+
+
+@pytest.mark.parametrize(
+    ("spec", "raw", "expected"),
+    [
+        (FieldSpec("abl0", FieldType.TEMPERATURE, "°C"), " 20.5 °C", 20.5),
+        (FieldSpec("abl0", FieldType.TEMPERATURE, "°C"), "13,5", 13.5),
+        (FieldSpec("abl0", FieldType.TEMPERATURE, "°C"), "-", None),
+        (FieldSpec("rest_time", FieldType.DAYS, "Tage"), "42 Tage", 42),
+        (FieldSpec("BsSt1", FieldType.HOURS, "h"), "     00", 0),
+        (FieldSpec("aktuell0", FieldType.STAGE), "Stufe2 Abwesend", 2),
+        (FieldSpec("aktuell0", FieldType.STAGE), "Stufe 3", 3),
+        (FieldSpec("aktuell0", FieldType.STAGE), "4", 4),
+        (FieldSpec("DiIn1", FieldType.SWITCH), "EIN", True),
+        (FieldSpec("DiIn1", FieldType.SWITCH), "", None),
+        (FieldSpec("filter0", FieldType.FLAG, marker="filterwechsel"), None, False),
+        (FieldSpec("events", FieldType.TEXT), "   ", None),
+    ],
+)
+def test_converters(spec: FieldSpec, raw: str | None, expected: object) -> None:
+    assert compile_field(spec)(raw) == expected
+
+
+def test_enum_maps_known_texts_to_canonical_values() -> None:
+    convert = compile_field(FieldSpec("bypass", FieldType.ENUM, options=BYPASS_STATES))
+
+    assert convert("Auto: Zu   ") == "auto_closed"
+    assert convert("hand:  auf") == "manual_open"
+    assert convert("Unbekannt ") is None
+    assert convert(None) is None
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+
+from datetime import datetime, timezone
+
+import aiohttp
+
+from custom_components.ventilation_system.clock import TICK_MARGIN, DeviceClock
+from custom_components.ventilation_system.coordinator import VentilationFleet
+
+from tests.simulator import Behavior, ControllerFarm
+
+CONTROLLERS = 100
+MAX_CONCURRENT = 8
+
+
+async def _poll_fleet(farm: ControllerFarm, fleet: VentilationFleet) -> None:
+    async with farm.serve() as server, aiohttp.ClientSession() as session:
+
+        async def poll(unit: int) -> None:
+            async with fleet.slot(f"unit{unit}"):
+                response = await session.get(server.make_url(f"/{unit}/status.xml"))
+                await response.read()
+
+        for _ in range(3):
+            await asyncio.gather(*(poll(unit) for unit in range(CONTROLLERS)))
+
+
+def test_fleet_bounds_concurrency_and_records_latency() -> None:
+    fleet = VentilationFleet(max_concurrent=MAX_CONCURRENT)
+    for unit in range(CONTROLLERS):
+        fleet.register(f"unit{unit}")
+    farm = ControllerFarm(CONTROLLERS, Behavior(latency=(0.0, 0.008)))
+
+    asyncio.run(_poll_fleet(farm, fleet))
+
+    assert all(
+        controller.requests["status"] == 3 for controller in farm.controllers
+    )
+    assert 1 < farm.max_in_flight <= MAX_CONCURRENT
+    for unit in range(CONTROLLERS):
+        percentiles = fleet.latency_percentiles(f"unit{unit}")
+        assert percentiles["p50"] is not None
+        assert percentiles["p50"] <= percentiles["p95"]
+
+
+def test_fleet_spreads_polls_over_interval() -> None:
+    fleet = VentilationFleet()
+    for unit in range(CONTROLLERS):
+        fleet.register(f"unit{unit}")
+
+    now = 1000.0
+    due = sorted(
+        (now + fleet.aligned_interval(f"unit{unit}", 30, now)) % 30
+        for unit in range(CONTROLLERS)
+    )
+    gaps = [later - earlier for earlier, later in zip(due, due[1:])]
+
+    assert all(abs(gap - 0.3) < 1e-6 for gap in gaps)
+    for unit in range(CONTROLLERS):
+        assert 15 <= fleet.aligned_interval(f"unit{unit}", 30, now) < 45
+
+
+def test_aligned_interval_stays_within_bounds() -> None:
+    fleet = VentilationFleet()
+    for unit in range(CONTROLLERS):
+        fleet.register(f"unit{unit}")
+
+    for now in (1000.0, 1007.3, 1029.9):
+        # Too narrow a window for every slot: polls leave their slot instead.
+        narrow = [
+            fleet.aligned_interval(f"unit{unit}", 30, now, 28, 32)
+            for unit in range(CONTROLLERS)
+        ]
+        assert all(28 <= seconds <= 32 for seconds in narrow)
+        # A window at least one interval wide always contains the slot.
+        for unit in range(CONTROLLERS):
+            seconds = fleet.aligned_interval(f"unit{unit}", 30, now, 30, 60)
+            assert 30 <= seconds <= 60
+            assert abs((now + seconds) % 30 - fleet.phase(f"unit{unit}") * 30) < 1e-6
+
+
+def _ticking_clock(now: float, tick: int) -> DeviceClock:
+    """Return a clock that saw a controller refresh every ``tick`` seconds."""
+    clock = DeviceClock(timezone.utc)
+    for poll in range(12):
+        received = now - 300 + poll * 13
+        stamp = datetime.fromtimestamp(received - received % tick, timezone.utc)
+        clock.observe(
+            f"<time>{stamp:%H:%M:%S}</time><date>{stamp:%d.%m.%Y}</date>".encode(),
+            received,
+        )
+    return clock
+
+
+def test_tick_delay_keeps_polls_in_their_slots() -> None:
+    fleet = VentilationFleet()
+    for unit in range(CONTROLLERS):
+        fleet.register(f"unit{unit}")
+    now = 1_700_000_000.0
+    clock = _ticking_clock(now, 10)
+    assert clock.tick == 10
+
+    slot = 30 / CONTROLLERS
+    for unit in range(CONTROLLERS):
+        seconds = fleet.aligned_interval(f"unit{unit}", 30, now, 5, 120)
+        delay = clock.delay_to_tick(now + seconds)
+        seconds += fleet.slot_delay(seconds, delay)
+        offset = (now + seconds - fleet.phase(f"unit{unit}") * 30) % 30
+        assert offset < slot or offset > 30 - 1e-6
+
+    # A lone controller owns the whole interval and waits for the refresh.
+    alone = VentilationFleet()
+    alone.register("unit0")
+    seconds = alone.aligned_interval("unit0", 30, now, 5, 120)
+    delay = clock.delay_to_tick(now + seconds)
+    assert alone.slot_delay(seconds, delay) == delay
+    # The poll lands just after a controller refresh.
+    assert abs((now + seconds + delay - TICK_MARGIN) % 10) < 1e-6
+
+
+def test_fleet_unregister_rebalances_phases() -> None:
+    fleet = VentilationFleet()
+    for host in ("a", "b", "c", "d"):
+        fleet.register(host)
+    fleet.unregister("b")
+
+    assert [fleet.phase(host) for host in ("a", "c", "d")] == [0, 1 / 3, 2 / 3]
+    assert fleet.latency_percentiles("b") == {"p50": None, "p95": None}
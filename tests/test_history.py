@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from custom_components.ventilation_system.history import (
+    RESOLUTIONS,
+    RollupRing,
+    VentilationHistory,
+)
+from custom_components.ventilation_system.status import VentilationStatus
+
+
+def test_rollup_ring_aggregates_per_bucket() -> None:
+    ring = RollupRing(60, 4)
+    for timestamp, value in ((0, 20.0), (30, 22.0), (59, 21.0), (60, 18.0)):
+        ring.add(timestamp, value)
+
+    assert ring.rows() == [(0.0, 20.0, 22.0, 21.0), (60.0, 18.0, 18.0, 18.0)]
+
+
+def test_rollup_ring_keeps_only_the_newest_buckets() -> None:
+    ring = RollupRing(60, 3)
+    for minute in range(10):
+        ring.add(minute * 60, float(minute))
+
+    rows = ring.rows()
+    assert [row[0] for row in rows] == [420.0, 480.0, 540.0]
+    assert [row[3] for row in rows] == [7.0, 8.0, 9.0]
+
+
+def test_history_records_all_resolutions_and_skips_missing_values() -> None:
+    history = VentilationHistory()
+    for second in range(0, 7200, 30):
+        history.add(second, VentilationStatus({"abl0": f"{second / 3600:.1f} °C"}))
+
+    result = history.as_dict(fields=["abl0", "zul0"])
+    assert set(result) == {"abl0", "zul0"}
+    assert set(result["abl0"]) == set(RESOLUTIONS)
+    assert len(result["abl0"]["1m"]) == 120
+    assert len(result["abl0"]["15m"]) == 8
+    last_hour = result["abl0"]["1h"][1]
+    assert last_hour["start"] == "1970-01-01T01:00:00+00:00"
+    assert (last_hour["min"], last_hour["max"]) == (1.0, 2.0)
+    assert 1.0 < last_hour["mean"] < 2.0
+    assert all(rows == [] for rows in result["zul0"].values())
+
+
+def test_history_is_bounded_to_a_day() -> None:
+    history = VentilationHistory(["BsSt1"])
+    for minute in range(3 * 24 * 60):
+        history.add(minute * 60, VentilationStatus({"BsSt1": str(minute)}))
+
+    for resolution, (width, size) in RESOLUTIONS.items():
+        rows = history.ring("BsSt1", resolution).rows()
+        assert len(rows) == size
+        assert rows[-1][0] - rows[0][0] == (size - 1) * width
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import xmltodict
+
+from custom_components.ventilation_system import metrics
+from custom_components.ventilation_system.history import VentilationHistory
+from custom_components.ventilation_system.status import VentilationStatus
+
+
+def load_fixture() -> dict[str, str]:
+    fixture = Path("tests/fixtures/status.xml").read_text(encoding="utf-8")
+    return xmltodict.parse(fixture)["response"]
+
+
+def test_instant_metrics_from_fixture() -> None:
+    status = VentilationStatus(load_fixture())
+
+    assert status.heat_recovery_efficiency == 87.9
+    assert status.heat_recovery_gain == 11.6
+    assert status.bypass_effectiveness is None
+    assert status.heat_recovery_efficiency_24h is None
+
+
+def test_metrics_need_a_usable_spread() -> None:
+    assert metrics.heat_recovery_efficiency(20.0, 20.2, 20.5) is None
+    assert metrics.heat_recovery_efficiency(None, 18.0, 20.0) is None
+    assert metrics.heat_recovery_gain(6.8, None) is None
+
+
+def test_bypass_effectiveness_only_when_open() -> None:
+    assert metrics.is_bypass_open("auto_open")
+    assert not metrics.is_bypass_open("auto_closed")
+    assert not metrics.is_bypass_open(None)
+    assert metrics.bypass_effectiveness(18.0, 19.0, 23.0, "open") == 80.0
+    assert metrics.bypass_effectiveness(18.0, 19.0, 23.0, "auto_closed") is None
+
+
+def test_replace_recomputes_derived_metrics() -> None:
+    status = VentilationStatus(load_fixture())
+
+    assert status.replace(bypass="Auto: Auf").bypass_effectiveness == 12.1
+
+
+def test_rolling_metrics_weigh_large_spreads() -> None:
+    aul = [0.0, 10.0, 19.5]
+    zul = [16.0, 18.0, 30.0]
+    abl = [20.0, 20.0, 20.0]
+
+    result = metrics.rolling_metrics(aul, zul, abl)
+
+    # (16 * 20 + 8 * 10 + 10.5 * 0.5) / (20 * 20 + 10 * 10 + 0.5 * 0.5)
+    assert result["heat_recovery_efficiency_24h"] == 81.0
+    assert result["heat_recovery_gain_24h"] == 11.5
+    assert metrics.rolling_metrics([5.0], [5.2], [5.5]) == {
+        "heat_recovery_efficiency_24h": None,
+        "heat_recovery_gain_24h": 0.2,
+    }
+    assert metrics.rolling_metrics([], [], []) == {
+        "heat_recovery_efficiency_24h": None,
+        "heat_recovery_gain_24h": None,
+    }
+
+
+def test_history_columns_are_aligned() -> None:
+    history = VentilationHistory()
+    history.add(0, VentilationStatus({"aul0": "5.0", "zul0": "17.0", "abl0": "20.0"}))
+    history.add(900, VentilationStatus({"aul0": "6.0", "abl0": "21.0"}))
+    history.add(1800, VentilationStatus({"aul0": "7.0", "zul0": "19.0", "abl0": "22.0"}))
+
+    aul, zul, abl = history.columns(("aul0", "zul0", "abl0"), "15m")
+
+    assert aul == [5.0, 7.0]
+    assert zul == [17.0, 19.0]
+    assert abl == [20.0, 22.0]
@@ -4,8 +4,9 @@ from pathlib import Path
 
 import xmltodict
 
-from custom_components.ventilation_system import parser
+from custom_components.ventilation_system.binary_sensor import BINARY_SENSORS
 from custom_components.ventilation_system.sensor import SENSORS
+from custom_components.ventilation_system.status import VentilationStatus
 
 
 def load_fixture() -> dict[str, str]:
@@ -13,41 +14,80 @@ def load_fixture() -> dict[str, str]:
     return xmltodict.parse(fixture)["response"]
 
 
-def test_value_as_text_handles_structured_inputs() -> None:
-    assert parser.value_as_text(" Auto: Zu   ") == "Auto: Zu"
-    assert parser.value_as_text({"#text": " 12 "}) == "12"
-    assert parser.value_as_text({"value": {"#text": "33"}}) == "33"
-    assert parser.value_as_text(["", {"#text": "abc "}]) == "abc"
-    assert parser.value_as_text(None) is None
+def test_sensor_descriptions_parse_fixture() -> None:
+    status = VentilationStatus(load_fixture())
+    values = {description.key: description.value_from(status) for description in SENSORS}
 
+    assert values["aktuell0"] == 2
+    assert values["control0"] == "manuelle Stufenwahl"
+    assert values["bypass"] == "auto_closed"
+    assert values["rest_time"] == 0
+    assert values["filtertime"] == 180
+    assert values["BipaAutAUL"] == 13.0
+    assert values["BipaAutABL"] == 23.0
+    assert values["MoStZlUm"] == 1813
+    assert values["MoStAlVo"] == 40
+    assert values["st4a"] == 75
+    assert values["air_volume_balance"] == 5
 
-def test_numeric_helpers_extract_numbers() -> None:
-    assert parser.extract_number(" 13,5 °C") == "13,5"
-    assert parser.extract_number({"value": {"#text": "33"}}) == "33"
-    assert parser.extract_number("foo") is None
 
+def test_enum_sensors_list_their_options() -> None:
+    bypass = next(description for description in SENSORS if description.key == "bypass")
 
-def test_as_float_and_int() -> None:
-    assert parser.as_float(" 13,5 °C") == 13.5
-    assert parser.as_float({"#text": "38"}) == 38.0
-    assert parser.as_int(" 15 Tage") == 15
-    assert parser.as_int({"value": {"#text": "33"}}) == 33
+    assert bypass.device_class == "enum"
+    assert "auto_closed" in bypass.options
+    assert "Auto: Zu" not in bypass.options
 
 
-def test_stage_value_parsing() -> None:
-    assert parser.stage_value("Stufe3 Abwesend") == 3
-    assert parser.stage_value("2") == 2
-    assert parser.stage_value(None) is None
+def test_rarely_used_sensors_are_disabled_by_default() -> None:
+    disabled = {
+        description.key
+        for description in SENSORS
+        if not description.entity_registry_enabled_default
+    }
 
+    assert disabled == {
+        "filtertime",
+        "BsSt1",
+        "BsSt2",
+        "BsSt3",
+        "BsSt4",
+        "BipaAutAUL",
+        "BipaAutABL",
+        *(f"st{stage}{side}" for stage in range(1, 5) for side in "za"),
+    }
 
-def test_sensor_descriptions_parse_fixture() -> None:
-    data = load_fixture()
-    values = {description.key: description.value_from(data) for description in SENSORS}
 
-    assert values["aktuell0"] == 2
-    assert values["control0"] == "manuelle Stufenwahl"
-    assert values["bypass"] == "Auto: Zu"
-    assert values["rest_time"] == 0
-    assert values["filtertime"] == 180
-    assert values["BipaAutAUL"] == 13.0
-    assert values["BipaAutABL"] == 23.0
+def test_binary_sensor_descriptions_parse_fixture() -> None:
+    status = VentilationStatus(load_fixture())
+    values = {description.key: description.is_on(status) for description in BINARY_SENSORS}
+
+    assert values == {"filter0": True, "DiIn1": False, "DiIn2": False, "DiIn3": True}
+
+
+def test_status_changed_fields() -> None:
+    data = load_fixture()
+    previous = VentilationStatus(data)
+
+    assert VentilationStatus(dict(data)) == previous
+    assert VentilationStatus(dict(data)).changed_fields(previous) == set()
+    assert VentilationStatus(data).changed_fields(None) >= {"aktuell0", "DiIn1"}
+
+    data = {**data, "abl0": " 20.5", "filter0": "OK"}
+    changed = VentilationStatus(data).changed_fields(previous)
+    assert changed == {
+        "abl0",
+        "filter0",
+        "filter_replacement_needed",
+        "heat_recovery_efficiency",
+    }
+
+
+def test_status_replace_returns_updated_copy() -> None:
+    status = VentilationStatus(load_fixture())
+    optimistic = status.replace(aktuell0=4)
+
+    assert optimistic.aktuell0 == 4
+    assert status.aktuell0 == 2
+    assert optimistic.raw is status.raw
+    assert optimistic.changed_fields(status) == {"aktuell0"}
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from datetime import time
+
+from custom_components.ventilation_system.decoder import decode_status
+from custom_components.ventilation_system.schedule import (
+    WeekProgram,
+    parse_week_schedule,
+)
+from custom_components.ventilation_system.services import _week_program
+
+from tests.simulator import FIXTURE, Behavior, SimulatedController
+
+
+def test_schedule_is_parsed_from_fixture() -> None:
+    schedule = parse_week_schedule(decode_status(FIXTURE.read_bytes()))
+
+    assert schedule[1] == WeekProgram(
+        1, 2, time(20, 0), time(23, 59), frozenset(range(1, 8))
+    )
+    assert schedule[2].as_dict() == {
+        "program": 2,
+        "stage": 2,
+        "start": "00:01",
+        "stop": "05:00",
+        "days": [1, 2, 3, 4, 5, 6, 7],
+        "active": True,
+    }
+    assert schedule[3].stage is None
+    assert not schedule[3].active
+
+
+def test_inactive_programs_match_regardless_of_times() -> None:
+    off = WeekProgram(3, None, time(0, 0), time(0, 0), frozenset())
+    no_days = WeekProgram(3, 2, time(6, 0), time(8, 0), frozenset())
+    on = WeekProgram(3, 2, time(6, 0), time(8, 0), frozenset({1}))
+
+    assert off.matches(no_days)
+    assert not off.matches(on)
+    assert on.matches(WeekProgram(3, 2, time(6, 0), time(8, 0), frozenset({1})))
+
+
+def test_written_program_matches_what_the_controller_reports() -> None:
+    desired = _week_program(
+        {
+            "program": 10,
+            "stage": 3,
+            "start": time(6, 30),
+            "stop": time(22, 0),
+            "days": ["mon", "wed", 7],
+        }
+    )
+    controller = SimulatedController(Behavior())
+    controller.set_week_program("P0S3AH06AM30EH22EM00W1030007")
+
+    assert parse_week_schedule(controller.values)[10] == desired
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+from homeassistant.core import HassJobType, HomeAssistant
+
+from custom_components.ventilation_system.commands import VentilationCommandQueue
+from custom_components.ventilation_system.const import (
+    CONF_IP_ADDRESS,
+    DATA_COMMANDS,
+    DATA_COORDINATOR,
+    DATA_ENTITY_INDEX,
+    DOMAIN,
+    SERVICE_SET_STAGE,
+)
+from custom_components.ventilation_system.services import async_register_services
+
+from tests.simulator import RecordingTransport
+
+ENTRY_ID = "entry"
+
+
+class StaticEntryIndex:
+    """Resolve every targeted entity to the one loaded entry."""
+
+    def async_entry_ids(self, entity_ids: set[str]) -> set[str]:
+        return {ENTRY_ID}
+
+
+class OptimisticRecorder:
+    def __init__(self) -> None:
+        self.optimistic: dict[str, Any] = {}
+
+    def async_set_optimistic(self, key: str, value: Any) -> None:
+        self.optimistic[key] = value
+
+
+def test_set_stage_service_reaches_the_command_queue(tmp_path) -> None:
+    async def run() -> tuple[list[str], dict[str, Any], dict[str, HassJobType]]:
+        hass = HomeAssistant(str(tmp_path))
+        transport = RecordingTransport()
+        refreshed = asyncio.Event()
+
+        async def on_drained() -> None:
+            refreshed.set()
+
+        commands = VentilationCommandQueue(hass, transport, on_drained)
+        coordinator = OptimisticRecorder()
+        hass.data[DOMAIN] = {}
+        async_register_services(hass)
+        hass.data[DOMAIN][DATA_ENTITY_INDEX] = StaticEntryIndex()
+        hass.data[DOMAIN][ENTRY_ID] = {
+            DATA_COMMANDS: commands,
+            DATA_COORDINATOR: coordinator,
+            CONF_IP_ADDRESS: "controller",
+        }
+
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_SET_STAGE,
+            {"entity_id": "fan.ventilation", "stage": 3},
+            blocking=True,
+        )
+        await asyncio.wait_for(refreshed.wait(), 1)
+        await commands.async_shutdown()
+        job_types = {
+            name: service.job.job_type
+            for name, service in hass.services.async_services()[DOMAIN].items()
+        }
+        return transport.sent, coordinator.optimistic, job_types
+
+    sent, optimistic, job_types = asyncio.run(run())
+
+    assert sent == ["/stufe.cgi?stufe=3"]
+    assert optimistic == {"aktuell0": 3}
+    # Handlers run on the event loop, never in the executor.
+    assert HassJobType.Executor not in job_types.values()
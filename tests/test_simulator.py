@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import time
+
+import aiohttp
+from aiohttp import FormData
+import pytest
+
+from custom_components.ventilation_system.commands import (
+    VentilationCommand,
+    VentilationCommandQueue,
+)
+from custom_components.ventilation_system.decoder import decode_status
+from custom_components.ventilation_system.services import _build_week_program_payload
+from custom_components.ventilation_system.status import VentilationStatus
+from custom_components.ventilation_system.transport import VentilationTransport
+from tests.simulator import Behavior, ControllerFarm, LoopOnlyHass
+
+
+def test_commands_round_trip_through_the_simulator() -> None:
+    farm = ControllerFarm(2, Behavior(latency=(0.0, 0.005), chunk_delay=0.001))
+
+    async def run() -> VentilationStatus:
+        async with farm.serve() as server:
+            transport = VentilationTransport(ControllerFarm.host(server, 1))
+
+            async def on_drained() -> None:
+                return None
+
+            queue = VentilationCommandQueue(LoopOnlyHass(), transport, on_drained)
+            bypass = FormData()
+            bypass.add_field("bypassSt", "bypa0")
+            await asyncio.gather(
+                queue.async_submit(
+                    VentilationCommand("stage", "GET", "/stufe.cgi?stufe=3")
+                ),
+                queue.async_submit(
+                    VentilationCommand("bypass", "POST", "/setup.htm", bypass)
+                ),
+                queue.async_submit(
+                    VentilationCommand(
+                        "week_program_4",
+                        "POST",
+                        "/wopla.htm",
+                        _build_week_program_payload(
+                            4, 1, time(6, 0), time(8, 30), ["1", "2"]
+                        ),
+                    )
+                ),
+            )
+            _, payload = await transport.async_get("/status.xml")
+            await transport.async_close()
+            return VentilationStatus(decode_status(payload))
+
+    status = asyncio.run(run())
+
+    assert status.aktuell0 == 3
+    assert status.bypass == "Hand: Auf"
+    assert status.raw["prg_start4"] == "06:00"
+    assert status.raw["prg_wota4"] == "Mo,Di"
+    assert farm.controllers[0].commands == []
+    assert farm.controllers[1].requests["status"] == 1
+
+
+def test_simulator_injects_errors() -> None:
+    farm = ControllerFarm(1, Behavior(error_rate=1.0))
+
+    async def run() -> None:
+        async with farm.serve() as server:
+            transport = VentilationTransport(ControllerFarm.host(server, 0))
+            try:
+                with pytest.raises(aiohttp.ClientResponseError) as err:
+                    await transport.async_get("/status.xml")
+                assert err.value.status == 500
+            finally:
+                await transport.async_close()
+
+    asyncio.run(run())
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from custom_components.ventilation_system.status import VentilationStatus
+from custom_components.ventilation_system.telemetry import DeltaSeries, FanTelemetry
+
+
+def fans(
+    supply_rpm: int, exhaust_rpm: int, supply: int, exhaust: int
+) -> VentilationStatus:
+    return VentilationStatus(
+        {
+            "MoStZlUm": str(supply_rpm),
+            "MoStAlUm": str(exhaust_rpm),
+            "MoStZlVo": str(supply),
+            "MoStAlVo": str(exhaust),
+        }
+    )
+
+
+def test_delta_series_round_trips_samples() -> None:
+    series = DeltaSeries(block_size=4)
+    samples = [(0, 1800), (30, 1812), (60, 1790), (100_000, 1795), (100_030, 40_000)]
+    for timestamp, value in samples:
+        series.append(timestamp, value)
+
+    assert list(series.samples()) == samples
+    assert list(series.samples(since=60)) == samples[2:]
+    assert len(series) == 5
+    # Only the two samples stored as deltas take space in the arrays.
+    assert series.nbytes == 8
+
+
+def test_delta_series_drops_oldest_blocks() -> None:
+    series = DeltaSeries(block_size=4, max_blocks=2)
+    for index in range(10):
+        series.append(index * 30, 1800 + index)
+
+    assert [timestamp for timestamp, _ in series.samples()] == [
+        index * 30 for index in range(4, 10)
+    ]
+
+
+def test_telemetry_detects_imbalance() -> None:
+    telemetry = FanTelemetry()
+    for index in range(10):
+        telemetry.add(index * 30, fans(1800, 1400, 45, 30))
+
+    imbalance = telemetry.imbalance()
+    assert imbalance == {"samples": 10, "mean": 15.0, "imbalanced": True}
+    assert telemetry.imbalance(since=10_000)["samples"] == 0
+
+
+def test_telemetry_detects_clogging_filter_trend() -> None:
+    telemetry = FanTelemetry()
+    for hour in range(48):
+        # The supply fan needs 1 % more rpm per day for the same volume.
+        telemetry.add(hour * 3600, fans(round(1800 * (1 + hour / 2400)), 1600, 45, 45))
+
+    result = telemetry.as_dict()
+    assert result["imbalance"]["imbalanced"] is False
+    supply = result["filters"]["supply"]
+    assert supply["samples"] == 48
+    assert 0.8 < supply["trend"] < 1.2
+    assert supply["clogging"] is True
+    assert result["filters"]["exhaust"]["clogging"] is False
+    assert "samples" not in result
+    assert len(telemetry.as_dict(include_samples=True)["samples"]["MoStZlUm"]) == 48
+
+
+def test_telemetry_needs_a_long_enough_window_for_trends() -> None:
+    telemetry = FanTelemetry()
+    for index in range(10):
+        telemetry.add(index * 30, fans(1800 + index, 1600, 45, 45))
+
+    supply = telemetry.filter_trend("supply")
+    assert supply["rpm_per_percent"] is not None
+    assert supply["trend"] is None
+    assert supply["clogging"] is None
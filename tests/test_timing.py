@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from custom_components.ventilation_system.timing import (
+    STAGES,
+    TimingHistogram,
+    TimingRecorder,
+)
+
+
+def test_histogram_reports_bucket_percentiles() -> None:
+    histogram = TimingHistogram()
+    for seconds in (0.003, 0.004, 0.004, 0.015, 0.120):
+        histogram.record(seconds)
+
+    result = histogram.as_dict()
+    assert result["count"] == 5
+    assert result["p50_ms"] == 5.0
+    assert result["p95_ms"] == 120.0
+    assert result["max_ms"] == 120.0
+    assert result["buckets"]["le_5"] == 3
+    assert result["buckets"]["le_20"] == 1
+    assert result["buckets"]["le_200"] == 1
+
+
+def test_histogram_caps_overflow_at_maximum() -> None:
+    histogram = TimingHistogram()
+    histogram.record(12.5)
+
+    assert histogram.percentile(0.5) == 12500.0
+    assert histogram.as_dict()["buckets"]["inf"] == 1
+
+
+def test_enabled_recorder_measures_stages() -> None:
+    recorder = TimingRecorder(True)
+    with recorder.measure("parse"):
+        pass
+    recorder.record("command", 0.25)
+
+    assert set(recorder.histograms) == set(STAGES)
+    assert recorder.histograms["parse"].count == 1
+    assert recorder.histograms["command"].last == 250.0
+    assert len(recorder.trace_configs()) == 1
+
+
+def test_disabled_recorder_records_nothing() -> None:
+    recorder = TimingRecorder()
+
+    assert recorder.measure("parse") is recorder.measure("body")
+    with recorder.measure("parse"):
+        pass
+    recorder.record("command", 0.25)
+
+    assert recorder.histograms == {}
+    assert recorder.trace_configs() == []
+    assert recorder.as_dict() == {"enabled": False, "stages": {}}
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from datetime import time
+
+import pytest
+import voluptuous as vol
+
+from custom_components.ventilation_system.services import _validate_week_programs
+
+
+def program(number: int, start: time, stop: time, days: list[str]) -> dict:
+    return {"program": number, "stage": 2, "start": start, "stop": stop, "days": days}
+
+
+def test_programs_on_different_days_or_times_are_accepted() -> None:
+    programs = [
+        program(1, time(20, 0), time(23, 59), ["mon", "tue"]),
+        program(2, time(0, 1), time(5, 0), ["mon", "tue"]),
+        program(3, time(6, 0), time(22, 0), ["sat"]),
+    ]
+
+    assert _validate_week_programs(programs) == programs
+
+
+def test_overlapping_programs_are_rejected() -> None:
+    with pytest.raises(vol.Invalid, match="overlap"):
+        _validate_week_programs(
+            [
+                program(1, time(6, 0), time(9, 0), ["mon"]),
+                program(2, time(8, 30), time(10, 0), ["mon", "tue"]),
+            ]
+        )
+
+
+def test_program_crossing_midnight_continues_on_the_next_day() -> None:
+    friday_night = program(1, time(22, 0), time(2, 0), ["fri"])
+    # Friday 01:00 is before the Friday program starts.
+    programs = [friday_night, program(2, time(1, 0), time(3, 0), ["fri"])]
+    assert _validate_week_programs(programs) == programs
+
+    with pytest.raises(vol.Invalid, match="overlap"):
+        _validate_week_programs(
+            [friday_night, program(2, time(1, 0), time(3, 0), ["sat"])]
+        )
+
+
+def test_sunday_night_wraps_to_monday() -> None:
+    with pytest.raises(vol.Invalid, match="overlap"):
+        _validate_week_programs(
+            [
+                program(1, time(6, 0), time(7, 0), ["mon"]),
+                program(2, time(23, 0), time(6, 30), ["sun"]),
+            ]
+        )
+
+
+def test_duplicate_program_slots_are_rejected() -> None:
+    with pytest.raises(vol.Invalid, match="twice"):
+        _validate_week_programs(
+            [
+                program(1, time(6, 0), time(7, 0), ["mon"]),
+                program(1, time(8, 0), time(9, 0), ["tue"]),
+            ]
+        )